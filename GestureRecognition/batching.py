@@ -0,0 +1,96 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Collects single requests from many threads and runs them as one batch.
+
+    A caller blocks in submit() while a worker thread takes every request
+    already queued, up to max_batch, calls batch_fn once on the whole list and
+    hands each caller its own result. Nobody waits for requests that have not
+    arrived: a lone request runs at once, and requests that come in while a
+    batch is running form the next one, so batches grow only as far as the
+    load makes them. max_wait caps how long collecting may go on while
+    requests keep trickling in.
+    """
+
+    def __init__(self, batch_fn, max_batch=8, max_wait=0.005, name="batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.batch_sizes = []
+        self.thread = threading.Thread(target=self._worker, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, item):
+        future = Future()
+        self.requests.put((item, future))
+        return future.result()
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        # Run as soon as the queue is drained
+        while len(batch) < self.max_batch and time.monotonic() < deadline:
+            try:
+                batch.append(self.requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.batch_fn(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batch_sizes.append(len(batch))
+            del self.batch_sizes[:-1000]
+            results = list(results)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+            # A short result list must not leave callers blocked in submit() forever
+            for _, future in batch[len(results):]:
+                future.set_exception(RuntimeError(
+                    f"{self.thread.name}: batch_fn returned {len(results)} results for {len(batch)} requests"))
+
+
+class BatchedClassifier:
+    """Classifier facade whose predict calls from all streams are batched together"""
+
+    def __init__(self, backend, max_batch=8, max_wait=0.005):
+        self.backend = backend
+        self.model = getattr(backend, 'model', None)
+        self.batcher = MicroBatcher(self._predict_batch, max_batch, max_wait, name="lstm-batcher")
+
+    def _predict_batch(self, sequences):
+        if hasattr(self.backend, 'predict_batch'):
+            return self.backend.predict_batch(sequences)
+        return [self.backend.predict(sequence) for sequence in sequences]
+
+    def predict(self, sequence):
+        return self.batcher.submit(sequence)
+
+
+class BatchedYoloDetector:
+    """YOLO facade whose detect calls from all streams are batched together"""
+
+    def __init__(self, detector, max_batch=8, max_wait=0.005):
+        self.detector = detector
+        self.model = getattr(detector, 'model', None)
+        self.batcher = MicroBatcher(self._detect_batch, max_batch, max_wait, name="yolo-batcher")
+
+    def _detect_batch(self, frames):
+        if hasattr(self.detector, 'detect_batch'):
+            return self.detector.detect_batch(frames)
+        return [self.detector.detect(frame) for frame in frames]
+
+    def detect(self, frame):
+        return self.batcher.submit(frame)
@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import platform
+import time
+
+import cv2
+import numpy as np
+
+from frame_context import FrameContext
+from frame_sources import open_source
+from stage_timing import StageTimer
+from testingModelWebcamOnly import GestureDetector
+
+
+def synthetic_frames(count, width=1280, height=720, seed=0):
+    """Noise frames, for measuring raw stage cost without any footage"""
+    rng = np.random.default_rng(seed)
+    pool = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(8)]
+    for i in range(count):
+        yield pool[i % len(pool)]
+
+
+def source_frames(spec, limit=None):
+    """Frames from any open_source spec, decoded on a background thread as fast as possible"""
+    source = open_source(spec, realtime=False)
+    if not source.isOpened():
+        raise RuntimeError(f"Could not open video source: {spec}")
+    count = 0
+    try:
+        while limit is None or count < limit:
+            ret, frame = source.read()
+            if not ret:
+                break
+            yield frame
+            count += 1
+    finally:
+        source.release()
+
+
+def run_benchmark(detector, frames, annotate=True, encode=True, warmup=10, record=None):
+    """Drive the detector as fast as possible and return per-stage stats and sustained FPS.
+
+    The first `warmup` frames run normally but are left out of the stats.
+    When `record` is a list, every frame's (gesture, features, bbox) is appended to it.
+    """
+    timer = StageTimer()
+    detector.timer = timer
+    processed = 0
+    start = None
+
+    for i, frame in enumerate(frames):
+        if i == warmup:
+            timer.reset()
+            start = time.perf_counter()
+
+        with timer.stage("frame"):
+            ctx = FrameContext(frame, mirror=True)
+            bbox = detector.detect_bbox(ctx)
+            features, hands_results, pose_results, hand_box = detector.process_landmarks(ctx, bbox)
+            detector.add_features(features)
+            gesture, confidence = detector.predict_gesture()
+            if record is not None:
+                record.append((gesture, features.copy(), None if bbox is None else np.asarray(bbox)))
+
+            if annotate:
+                with timer.stage("draw"):
+                    annotated_frame = detector.annotate(ctx, bbox, hands_results, pose_results, hand_box,
+                                                        gesture, confidence)
+                if encode:
+                    with timer.stage("encode"):
+                        cv2.imencode('.jpg', annotated_frame)
+
+        if start is not None:
+            processed += 1
+
+    detector.timer = None
+    elapsed = time.perf_counter() - start if start is not None else 0.0
+    return {
+        'frames': processed,
+        'elapsed_s': elapsed,
+        'fps': processed / elapsed if elapsed > 0 else 0.0,
+        'stages': timer.summary(),
+    }
+
+
+def print_report(results):
+    print(f"\n📊 {results['frames']} frames in {results['elapsed_s']:.1f}s -> {results['fps']:.1f} FPS")
+    print(f"{'stage':10} | {'count':>6} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    print("-" * 52)
+    for name, stats in results['stages'].items():
+        print(f"{name:10} | {stats['count']:6d} | {stats['p50_ms']:8.2f} | {stats['p95_ms']:8.2f} | {stats['p99_ms']:8.2f}")
+
+
+def box_iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, x2 - x1) * max(0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def compare_records(reference, candidate):
+    """How closely a run's per-frame outputs match a reference run over the same frames"""
+    pairs = list(zip(reference, candidate))
+    ious = [box_iou(r[2], c[2]) for r, c in pairs if r[2] is not None and c[2] is not None]
+    return {
+        'gesture_agreement': float(np.mean([r[0] == c[0] for r, c in pairs])),
+        'feature_mae': float(np.mean([np.mean(np.abs(r[1] - c[1])) for r, c in pairs])),
+        'box_presence_agreement': float(np.mean([(r[2] is None) == (c[2] is None) for r, c in pairs])),
+        'box_iou': float(np.mean(ious)) if ious else None,
+    }
+
+
+def compare_process_widths(detector, make_frames, widths, annotate=True, warmup=10):
+    """Benchmark each processing width on the same frames, scoring accuracy against the first one.
+
+    A width of 0 means full resolution, which makes the natural reference.
+    """
+    rows = []
+    reference = None
+    for width in widths:
+        detector.process_width = width or None
+        detector.reset_buffers()
+        record = []
+        results = run_benchmark(detector, make_frames(), annotate=annotate, warmup=warmup, record=record)
+        if reference is None:
+            reference = record
+        results['process_width'] = width or None
+        results['accuracy'] = compare_records(reference, record)
+        rows.append(results)
+    return rows
+
+
+def print_comparison(rows):
+    print(f"\n{'width':>6} | {'FPS':>6} | {'frame p50':>9} | {'gesture =':>9} | {'feat MAE':>8} | {'box IoU':>7}")
+    print("-" * 62)
+    for row in rows:
+        accuracy = row['accuracy']
+        width = row['process_width'] or 'full'
+        frame_p50 = row['stages'].get('frame', {}).get('p50_ms', 0.0)
+        iou = f"{accuracy['box_iou']:.3f}" if accuracy['box_iou'] is not None else "-"
+        print(f"{width:>6} | {row['fps']:6.1f} | {frame_p50:7.2f}ms | {accuracy['gesture_agreement']:9.1%} | "
+              f"{accuracy['feature_mae']:8.4f} | {iou:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the GestureDetector pipeline without a camera")
+    parser.add_argument('--video', help="Video file, frame directory or stream URL to replay (default: synthetic frames)")
+    parser.add_argument('--frames', type=int, default=300, help="Frames to process")
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--model', default="TwoModels/gesture_model.h5")
+    parser.add_argument('--yolo', default="TwoModels/best.pt")
+    parser.add_argument('--backend', default="tf_function")
+    parser.add_argument('--yolo-backend', default="ultralytics")
+    parser.add_argument('--stride', type=int, default=None, help="LSTM inference stride")
+    parser.add_argument('--streaming-phases', type=int, default=None)
+    parser.add_argument('--detect-interval', type=int, default=None,
+                        help="Run YOLO every N frames and track the box in between (1 = every frame)")
+    parser.add_argument('--process-width', type=int, default=None,
+                        help="Width YOLO and pose run at (0 = full resolution)")
+    parser.add_argument('--compare-widths', default=None,
+                        help="Comma-separated processing widths to compare for speed and accuracy, "
+                             "scored against the first (e.g. 0,960,640,480)")
+    parser.add_argument('--no-annotate', action='store_true', help="Skip drawing and JPEG encoding")
+    parser.add_argument('--output', default="benchmark_results.json")
+    args = parser.parse_args()
+
+    detector_kwargs = {'backend': args.backend, 'yolo_backend': args.yolo_backend,
+                       'streaming_phases': args.streaming_phases}
+    if args.stride is not None:
+        detector_kwargs['inference_stride'] = args.stride
+    if args.detect_interval is not None:
+        detector_kwargs['detect_interval'] = args.detect_interval
+    if args.process_width is not None:
+        detector_kwargs['process_width'] = args.process_width or None
+
+    start = time.perf_counter()
+    detector = GestureDetector(args.model, args.yolo, **detector_kwargs)
+    load_time = time.perf_counter() - start
+
+    total = args.frames + args.warmup
+
+    def make_frames():
+        return source_frames(args.video, total) if args.video else synthetic_frames(total)
+
+    if args.compare_widths:
+        widths = [int(width) for width in args.compare_widths.split(',')]
+        rows = compare_process_widths(detector, make_frames, widths, annotate=not args.no_annotate,
+                                      warmup=args.warmup)
+        print_comparison(rows)
+        results = {'comparison': rows}
+    else:
+        results = run_benchmark(detector, make_frames(), annotate=not args.no_annotate, warmup=args.warmup)
+
+    results['model_load_s'] = load_time
+    if detector.roi_tracker is not None:
+        results['roi_tracking'] = detector.roi_tracker.stats()
+    results['config'] = {
+        'source': args.video or 'synthetic',
+        'annotate': not args.no_annotate,
+        **{k: v for k, v in vars(args).items() if k not in ('output',)},
+    }
+    results['environment'] = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+    if 'comparison' not in results:
+        print_report(results)
+    if 'roi_tracking' in results:
+        print(f"🎯 YOLO ran on {results['roi_tracking']['yolo_ratio']:.0%} of frames")
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
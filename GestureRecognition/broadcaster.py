@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+
+import cv2
+
+from metrics import LatencyHistogram
+
+
+class GestureBroadcaster:
+    """Fans gesture events out to WebSocket subscribers.
+
+    Lives on the asyncio event loop. The detection thread hands events over
+    with publish_threadsafe, which schedules publish on the loop through
+    call_soon_threadsafe. Every subscriber has its own bounded queue, and a
+    subscriber that falls behind loses its oldest pending events rather than
+    holding up the others. Idle subscribers just wait on their queue.
+    """
+
+    def __init__(self, initial_event, queue_size=8):
+        self.latest = initial_event
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.loop = None
+        self.dropped_events = 0
+
+    def attach(self, loop):
+        self.loop = loop
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        # New subscribers start from the current state
+        queue.put_nowait(self.latest)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, event):
+        """Deliver an event to every subscriber; must run on the event loop"""
+        self.latest = event
+        for queue in self.subscribers:
+            if queue.full():
+                # Slow consumer: drop its oldest event
+                queue.get_nowait()
+                self.dropped_events += 1
+            queue.put_nowait(event)
+
+    def publish_threadsafe(self, event):
+        """Hand an event over from another thread"""
+        if self.loop is None or self.loop.is_closed():
+            self.latest = event
+            return
+        self.loop.call_soon_threadsafe(self.publish, event)
+
+
+class MjpegBroadcaster:
+    """Encodes each new annotated frame to JPEG once and shares it with every viewer.
+
+    The detection thread hands over raw frames with publish_frame. One encoder
+    thread takes the newest one (older unencoded frames are skipped), encodes
+    it, and posts the multipart chunk to the event loop tagged with a frame
+    sequence number. Viewers are async generators that wake on new chunks and
+    never send the same sequence number twice, so encode cost is independent
+    of the number of viewers. Nothing is encoded while nobody is watching.
+
+    width downscales frames before encoding (keeping the aspect ratio) and
+    max_fps caps how often a frame is encoded, so one instance can serve a
+    cheaper streaming tier.
+    """
+
+    def __init__(self, jpeg_quality=None, width=None, max_fps=None):
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality] if jpeg_quality else []
+        self.width = width
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.condition = threading.Condition()
+        self.pending_frame = None
+        self.pending_seq = 0
+        self.encoded_seq = 0
+        self.viewers = 0
+        self.encoded_frames = 0
+        self.encode_time = LatencyHistogram()
+
+        # Owned by the event loop
+        self.loop = None
+        self.latest_chunk = None
+        self.latest_seq = 0
+        self.frame_event = None
+
+    def attach(self, loop):
+        self.loop = loop
+        self.frame_event = asyncio.Event()
+        threading.Thread(target=self._encoder_loop, name="mjpeg-encoder", daemon=True).start()
+
+    def publish_frame(self, frame):
+        """Called from the detection thread with each new annotated frame"""
+        with self.condition:
+            self.pending_frame = frame
+            self.pending_seq += 1
+            self.condition.notify()
+
+    def _has_work(self):
+        return self.viewers > 0 and self.pending_seq != self.encoded_seq
+
+    def _resize(self, frame):
+        h, w = frame.shape[:2]
+        if not self.width or w <= self.width:
+            return frame
+        height = int(round(h * self.width / w))
+        return cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+
+    def _encoder_loop(self):
+        last_encode = 0.0
+        while True:
+            # Respect the tier's frame rate cap before picking up the newest frame
+            wait = last_encode + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            with self.condition:
+                self.condition.wait_for(self._has_work)
+                frame, seq = self.pending_frame, self.pending_seq
+                self.encoded_seq = seq
+            last_encode = time.monotonic()
+            start = time.perf_counter()
+            ret, jpeg = cv2.imencode('.jpg', self._resize(frame), self.encode_params)
+            self.encode_time.observe(time.perf_counter() - start)
+            if not ret:
+                continue
+            self.encoded_frames += 1
+            chunk = (b'--frame\r\n'
+                     b'Content-Type: image/jpeg\r\n\r\n' + jpeg.tobytes() + b'\r\n')
+            self.loop.call_soon_threadsafe(self._post_chunk, seq, chunk)
+
+    def _post_chunk(self, seq, chunk):
+        self.latest_seq, self.latest_chunk = seq, chunk
+        event, self.frame_event = self.frame_event, asyncio.Event()
+        event.set()
+
+    def _set_viewers(self, delta):
+        with self.condition:
+            self.viewers += delta
+            idle = self.viewers == 0
+            if idle:
+                # The detector stops drawing without viewers, so whatever is pending
+                # is stale by the time the next viewer arrives
+                self.pending_frame = None
+                self.encoded_seq = self.pending_seq
+            self.condition.notify()
+        if idle:
+            self.latest_chunk = None
+
+    async def stream(self):
+        """Async generator of multipart JPEG chunks for one viewer"""
+        self._set_viewers(1)
+        try:
+            last_seq = 0
+            while True:
+                event = self.frame_event
+                if self.latest_chunk is not None and self.latest_seq != last_seq:
+                    last_seq = self.latest_seq
+                    yield self.latest_chunk
+                    continue
+                await event.wait()
+        finally:
+            self._set_viewers(-1)
@@ -0,0 +1,289 @@
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from batching import BatchedClassifier, BatchedYoloDetector
+from broadcaster import GestureBroadcaster, MjpegBroadcaster
+from inference_backends import SharedClassifier, load_backend
+from metrics import LatencyHistogram, StageMetrics
+from testingModelWebcamOnly import GestureDetector
+from yolo_backends import SharedYoloDetector, load_yolo_backend
+
+NO_GESTURE = {"gesture": "No gesture detected", "confidence": 0.0}
+
+# A stream whose last frame is older than this is reported as not ready
+STALE_FRAME_SECONDS = 5.0
+
+
+def import_mediapipe():
+    import mediapipe
+    return mediapipe
+
+
+def parse_source(config):
+    """A STREAMS value: a bare open_source spec, or a dict with 'source' and optional 'width'/'height'"""
+    if isinstance(config, dict):
+        return config['source'], {key: config[key] for key in ('width', 'height') if key in config}
+    return config, {}
+
+
+class DetectionStream:
+    """One camera/court: its detector thread plus the broadcasters its clients read from"""
+
+    def __init__(self, name, source, tiers, pipeline_mode=True):
+        self.name = name
+        # Capture resolution for webcams; open_source's default when not configured
+        self.source, self.capture_options = parse_source(source)
+        self.pipeline_mode = pipeline_mode
+        self.latest_gesture = dict(NO_GESTURE)
+        self.latest_frame = None
+        self.gesture_broadcaster = GestureBroadcaster(self.latest_gesture)
+        self.mjpeg_broadcasters = {tier: MjpegBroadcaster(**config) for tier, config in tiers.items()}
+        self.thread = None
+        self.detector = None
+        self.running = False
+        self.error = None
+
+        # Observability
+        self.stage_metrics = StageMetrics()
+        self.latency = LatencyHistogram()
+        self.frames = 0
+        self.annotated_frames = 0
+        self.gesture_events = 0
+        self.last_frame_at = None
+
+    def attach(self, loop):
+        self.gesture_broadcaster.attach(loop)
+        for broadcaster in self.mjpeg_broadcasters.values():
+            broadcaster.attach(loop)
+
+    def start(self, detector):
+        self.detector = detector
+        detector.timer = self.stage_metrics
+        # Draw overlays only while someone watches a /video_feed tier
+        detector.annotation_needed = self.has_viewers
+        self.running = True
+        self.thread = threading.Thread(target=self._run, args=(detector,), name=f"detect-{self.name}", daemon=True)
+        self.thread.start()
+
+    def _run(self, detector):
+        try:
+            if self.pipeline_mode:
+                frames = detector.run_pipelined_with_frame(self.source, **self.capture_options)
+            else:
+                frames = detector.run_generator_with_frame(self.source, **self.capture_options)
+            for gesture, confidence, frame in frames:
+                self.publish(gesture, confidence, frame)
+                if detector.pipeline is not None:
+                    self.latency.observe(detector.pipeline.last_latency)
+        except Exception as e:
+            self.error = repr(e)
+            print(f"⚠️ Detection stream '{self.name}' stopped:")
+            traceback.print_exc()
+        finally:
+            self.running = False
+
+    def has_viewers(self):
+        return any(broadcaster.viewers > 0 for broadcaster in self.mjpeg_broadcasters.values())
+
+    def publish(self, gesture, confidence, frame):
+        if gesture is not None:
+            gesture_event = {"gesture": gesture, "confidence": round(float(confidence), 2)}
+        else:
+            gesture_event = dict(NO_GESTURE)
+        self.frames += 1
+        self.last_frame_at = time.time()
+        # frame is None while headless
+        if frame is not None:
+            self.latest_frame = frame
+            self.annotated_frames += 1
+            for broadcaster in self.mjpeg_broadcasters.values():
+                broadcaster.publish_frame(frame)
+        # Only publish changes; unchanged frames cost subscribers nothing
+        if gesture_event != self.latest_gesture:
+            self.latest_gesture = gesture_event
+            self.gesture_events += 1
+            self.gesture_broadcaster.publish_threadsafe(gesture_event)
+
+    def frame_age(self):
+        """Seconds since the last processed frame, or None before the first one"""
+        if self.last_frame_at is None:
+            return None
+        return time.time() - self.last_frame_at
+
+    def status(self):
+        age = self.frame_age()
+        return {
+            "running": self.running,
+            "frames": self.frames,
+            "last_frame_age_s": None if age is None else round(age, 3),
+            "ready": self.running and age is not None and age < STALE_FRAME_SECONDS,
+            "error": self.error,
+        }
+
+    def write_metrics(self, writer):
+        labels = {"stream": self.name}
+        writer.gauge("stream_running", "1 while the stream's detector thread is running", self.running, labels)
+        writer.counter("frames_total", "Frames processed and published", self.frames, labels)
+        writer.counter("annotated_frames_total", "Frames drawn for /video_feed viewers (the rest ran headless)",
+                       self.annotated_frames, labels)
+        writer.counter("gesture_events_total", "Gesture changes published to WebSocket clients",
+                       self.gesture_events, labels)
+        age = self.frame_age()
+        if age is not None:
+            writer.gauge("last_frame_age_seconds", "Seconds since the last processed frame", age, labels)
+
+        detector = self.detector
+        pipeline = detector.pipeline if detector is not None else None
+        errors = detector.frame_errors if detector is not None else 0
+        if pipeline is not None:
+            errors += pipeline.stage_errors
+            writer.counter("dropped_frames_total", "Frames dropped between pipeline stages",
+                           pipeline.dropped_frames, labels)
+            for queue_name, depth in pipeline.queue_depths().items():
+                writer.gauge("queue_depth", "Frames waiting between pipeline stages", depth,
+                             {**labels, "queue": queue_name})
+            writer.histogram("frame_latency_seconds", "Capture-to-publish latency per frame", self.latency, labels)
+        writer.counter("frame_errors_total", "Frames that failed processing", errors, labels)
+        if detector is not None and detector.roi_tracker is not None:
+            tracker_stats = detector.roi_tracker.stats()
+            writer.counter("yolo_frames_total", "Frames that ran YOLO", tracker_stats['yolo_frames'], labels)
+            writer.counter("tracked_frames_total", "Frames that reused the tracked YOLO box",
+                           tracker_stats['tracked_frames'], labels)
+
+        for stage, histogram in list(self.stage_metrics.histograms.items()):
+            writer.histogram("stage_latency_seconds", "Per-stage processing latency", histogram,
+                             {**labels, "stage": stage})
+
+        writer.gauge("websocket_clients", "Connected /ws/gesture clients", len(self.gesture_broadcaster.subscribers), labels)
+        writer.counter("websocket_dropped_events_total", "Gesture events dropped for slow WebSocket clients",
+                       self.gesture_broadcaster.dropped_events, labels)
+        for tier, broadcaster in self.mjpeg_broadcasters.items():
+            tier_labels = {**labels, "tier": tier}
+            writer.gauge("mjpeg_viewers", "Connected /video_feed viewers", broadcaster.viewers, tier_labels)
+            writer.counter("mjpeg_encoded_frames_total", "Frames JPEG-encoded for /video_feed",
+                           broadcaster.encoded_frames, tier_labels)
+            writer.histogram("mjpeg_encode_seconds", "JPEG encode time per frame", broadcaster.encode_time, tier_labels)
+
+
+class StreamManager:
+    """Runs one GestureDetector per named stream, sharing the loaded models between them.
+
+    The classifier and YOLO weights are loaded once and shared behind locks;
+    each detector keeps its own MediaPipe graphs and feature buffers, since
+    those carry per-camera tracking state. Every stream runs on its own
+    threads, and the heavy model calls release the GIL, so streams spread
+    across the available cores.
+
+    With batch_inference (gesture_api turns it on when more than one stream
+    is configured), YOLO and classifier calls from all streams instead go
+    through one forward pass per batch of whatever calls are queued; no call
+    waits for other streams, and batch_window only caps collecting a batch.
+    """
+
+    def __init__(self, sources, tiers, model_path, yolo_path, backend="tf_function",
+                 yolo_backend="ultralytics", pipeline_mode=True, detector_options=None,
+                 batch_inference=False, batch_window=0.005):
+        self.streams = {name: DetectionStream(name, source, tiers, pipeline_mode) for name, source in sources.items()}
+        self.model_path = model_path
+        self.yolo_path = yolo_path
+        self.backend = backend
+        self.yolo_backend = yolo_backend
+        self.detector_options = detector_options or {}
+        self.batch_inference = batch_inference
+        self.batch_window = batch_window
+        self.classifier = None
+        self.yolo_detector = None
+        self.models_loaded = False
+        self.model_load_seconds = None
+        self.warm_up_seconds = None
+        self.load_error = None
+        # starting -> loading -> warming -> running, or failed
+        self.phase = "starting"
+
+    def get(self, name):
+        return self.streams.get(name)
+
+    def load_models(self):
+        """Load the classifier and YOLO, and import MediaPipe, all at the same time.
+
+        The three are independent and mostly spend their time in native code
+        (file I/O, graph construction), so threads overlap them well.
+        """
+        print(f"🔄 Loading shared models for {len(self.streams)} stream(s)...")
+        self.phase = "loading"
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="model-load") as executor:
+            classifier_future = executor.submit(load_backend, self.backend, self.model_path)
+            yolo_future = executor.submit(load_yolo_backend, self.yolo_backend, self.yolo_path)
+            mediapipe_future = executor.submit(import_mediapipe)
+            classifier = classifier_future.result()
+            yolo_detector = yolo_future.result()
+            mediapipe_future.result()
+        if self.batch_inference:
+            max_batch = len(self.streams)
+            self.classifier = BatchedClassifier(classifier, max_batch, self.batch_window)
+            self.yolo_detector = BatchedYoloDetector(yolo_detector, max_batch, self.batch_window)
+        else:
+            self.classifier = SharedClassifier(classifier)
+            self.yolo_detector = SharedYoloDetector(yolo_detector)
+        self.model_load_seconds = time.perf_counter() - start
+        self.models_loaded = True
+        print(f"✅ Shared models loaded in {self.model_load_seconds:.1f}s!")
+
+    def create_detector(self):
+        return GestureDetector(self.model_path, self.yolo_path, classifier=self.classifier,
+                               yolo_detector=self.yolo_detector, **self.detector_options)
+
+    def create_warm_detector(self):
+        detector = self.create_detector()
+        detector.warm_up()
+        return detector
+
+    def attach(self, loop):
+        for stream in self.streams.values():
+            stream.attach(loop)
+
+    def start(self):
+        """Load the shared models, then start every stream; meant to run off the event loop"""
+        try:
+            self.load_models()
+            # Per-stream MediaPipe graphs are built and every model is warmed in parallel
+            self.phase = "warming"
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=len(self.streams), thread_name_prefix="warm-up") as executor:
+                detectors = list(executor.map(lambda _: self.create_warm_detector(), self.streams))
+            self.warm_up_seconds = time.perf_counter() - start
+            print(f"🔥 Detectors warmed up in {self.warm_up_seconds:.1f}s")
+        except Exception as e:
+            self.load_error = repr(e)
+            self.phase = "failed"
+            print("❌ Could not load models:")
+            traceback.print_exc()
+            return
+        for stream, detector in zip(self.streams.values(), detectors):
+            stream.start(detector)
+        self.phase = "running"
+
+    def status(self):
+        streams = {name: stream.status() for name, stream in self.streams.items()}
+        return {
+            "phase": self.phase,
+            "models_loaded": self.models_loaded,
+            "model_load_s": self.model_load_seconds,
+            "warm_up_s": self.warm_up_seconds,
+            "model_error": self.load_error,
+            "ready": self.models_loaded and all(stream["ready"] for stream in streams.values()),
+            "streams": streams,
+        }
+
+    def write_metrics(self, writer):
+        writer.gauge("models_loaded", "1 once the shared models have finished loading", self.models_loaded)
+        if self.model_load_seconds is not None:
+            writer.gauge("model_load_seconds", "Time taken to load the shared models", self.model_load_seconds)
+        if self.warm_up_seconds is not None:
+            writer.gauge("warm_up_seconds", "Time taken to build and warm up the per-stream detectors",
+                         self.warm_up_seconds)
+        for stream in self.streams.values():
+            stream.write_metrics(writer)
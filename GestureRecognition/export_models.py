@@ -0,0 +1,94 @@
+import argparse
+import os
+
+
+def quantize_onnx(output_path):
+    """Dynamic int8 quantization of the weights, written next to the float model"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantized_path = output_path.replace('.onnx', '_int8.onnx')
+    quantize_dynamic(output_path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
+
+
+def export_classifier_onnx(model_path, output_path, int8=False):
+    import tensorflow as tf
+    import tf2onnx
+    from tensorflow.keras.models import load_model
+
+    model = load_model(model_path)
+    spec = (tf.TensorSpec((1,) + tuple(model.input_shape[1:]), tf.float32, name="sequence"),)
+
+    # tf2onnx.convert.from_keras does not understand Keras 3 models, so the
+    # model is traced through a plain tf.function instead
+    @tf.function(input_signature=spec)
+    def classify(sequence):
+        return model(sequence, training=False)
+
+    tf2onnx.convert.from_function(classify, input_signature=spec, output_path=output_path)
+
+    if int8:
+        output_path = quantize_onnx(output_path)
+    return output_path
+
+
+def export_classifier_tflite(model_path, output_path, int8=False):
+    import tensorflow as tf
+    from tensorflow.keras.models import load_model
+
+    model = load_model(model_path)
+    # Fix the batch size to 1 so the LSTMs convert to fused TFLite ops
+    fixed = tf.keras.Sequential([tf.keras.Input(batch_shape=(1,) + tuple(model.input_shape[1:]))] + model.layers)
+    converter = tf.lite.TFLiteConverter.from_keras_model(fixed)
+    if int8:
+        # Weight-only int8: with a representative dataset (full int8) the
+        # converter crashes on these LSTMs, and weights are most of the size
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        output_path = output_path.replace('.tflite', '_int8.tflite')
+
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+    return output_path
+
+
+def export_yolo(yolo_path, fmt, int8=False, imgsz=640):
+    from ultralytics import YOLO
+
+    # Ultralytics writes the file next to the .pt and returns its path. Its
+    # ONNX export ignores int8, so that file is quantized here afterwards.
+    if fmt == 'onnx':
+        output_path = YOLO(yolo_path).export(format=fmt, imgsz=imgsz)
+        return quantize_onnx(output_path) if int8 else output_path
+    return YOLO(yolo_path).export(format=fmt, imgsz=imgsz, int8=int8)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the gesture classifier and YOLO detector for ONNX Runtime / TFLite")
+    parser.add_argument('--model', default="TwoModels/gesture_model.h5", help="Keras gesture classifier (.h5)")
+    parser.add_argument('--yolo', default="TwoModels/best.pt", help="Ultralytics YOLO weights (.pt)")
+    parser.add_argument('--format', choices=['onnx', 'tflite'], default='onnx')
+    parser.add_argument('--int8', action='store_true', help="Also quantize to int8")
+    parser.add_argument('--skip-yolo', action='store_true')
+    parser.add_argument('--skip-classifier', action='store_true')
+    args = parser.parse_args()
+
+    if not args.skip_classifier:
+        print(f"🔄 Exporting gesture classifier to {args.format}...")
+        output_path = os.path.splitext(args.model)[0] + '.' + args.format
+        if args.format == 'onnx':
+            output_path = export_classifier_onnx(args.model, output_path, args.int8)
+        else:
+            output_path = export_classifier_tflite(args.model, output_path, args.int8)
+        print(f"✅ Gesture classifier exported to {output_path}")
+
+    if not args.skip_yolo:
+        print(f"🔄 Exporting YOLO to {args.format}...")
+        output_path = export_yolo(args.yolo, args.format, args.int8)
+        print(f"✅ YOLO exported to {output_path}")
+
+    print("ℹ️  Check the classifier with: python inference_backends.py "
+          f"{args.model} {args.format}=<exported file>")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """Content-addressed on-disk cache of per-video (frames, 92) landmark arrays.
+
+    Entries are keyed by the video's content hash together with the model
+    checksums and extraction settings, so changing any of them simply misses
+    the cache and old entries are never read again. Arrays are stored as
+    .npy and loaded memory-mapped.
+    """
+
+    def __init__(self, cache_dir, settings):
+        self.cache_dir = cache_dir
+        # Settings are hashed once; they must be JSON serializable
+        self.settings_hash = hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Video hashes memoized by (path, size, mtime) to avoid re-reading unchanged files
+        self.index_path = os.path.join(cache_dir, 'video_hashes.json')
+        self.video_hashes = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path) as f:
+                    self.video_hashes = json.load(f)
+            except (OSError, ValueError):
+                self.video_hashes = {}
+
+    def video_hash(self, video_path):
+        stat = os.stat(video_path)
+        memo_key = f"{os.path.abspath(video_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        if memo_key not in self.video_hashes:
+            self.video_hashes[memo_key] = file_sha256(video_path)
+            self._write_index()
+        return self.video_hashes[memo_key]
+
+    def _write_index(self):
+        # The index is only a memo: a per-process temp name keeps concurrent
+        # writers from clobbering each other, and a failed write is not fatal
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.video_hashes, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"⚠️ Could not update {self.index_path}: {e}")
+
+    def entry_path(self, video_path):
+        key = hashlib.sha256(f"{self.video_hash(video_path)}|{self.settings_hash}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def load(self, video_path):
+        """Return the cached features for a video, or None on a miss"""
+        path = self.entry_path(video_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            # Truncated or corrupt entry: treat as a miss so it gets rebuilt
+            return None
+
+    def save(self, video_path, features):
+        path = self.entry_path(video_path)
+        tmp_path = f"{path[:-len('.npy')]}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, np.asarray(features, dtype=np.float32))
+        os.replace(tmp_path, path)
@@ -0,0 +1,146 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+from frame_context import FrameContext
+from landmark_features import FEATURE_SIZE, HAND_FEATURES, hand_image, write_hand_features, write_pose_features
+
+# Landmark extraction for training. Kept apart from mph5Training so worker
+# processes never import TensorFlow, scikit-learn or the plotting stack.
+
+MAX_FRAMES_PER_VIDEO = 150
+
+# Each worker process loads its own YOLO and MediaPipe
+NUM_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+
+HANDS_SETTINGS = {'max_num_hands': 2, 'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5}
+POSE_SETTINGS = {'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5}
+
+# YOLOv9 and MediaPipe, created per process by init_extractors
+yolo_model = None
+hands = None
+pose = None
+
+def init_extractors(yolo_path, single_thread=False):
+    """Load the extraction models into this process.
+
+    Worker processes pass single_thread=True: with one process per core,
+    torch's and OpenCV's own thread pools would only oversubscribe the CPU.
+    """
+    global yolo_model, hands, pose
+    if single_thread:
+        import torch
+        torch.set_num_threads(1)
+        cv2.setNumThreads(1)
+    if yolo_model is None:
+        import mediapipe as mp
+        from ultralytics import YOLO
+        yolo_model = YOLO(yolo_path)
+        hands = mp.solutions.hands.Hands(static_image_mode=False, **HANDS_SETTINGS)
+        pose = mp.solutions.pose.Pose(static_image_mode=False, **POSE_SETTINGS)
+
+def extract_hand_landmarks(ctx, hand_bbox=None, out=None):
+    # Same crop, layout and values as inference (landmark_features.py)
+    rgb, _ = hand_image(ctx, hand_bbox)
+    return write_hand_features(hands.process(rgb), out)
+
+def extract_pose_landmarks(ctx, out=None):
+    return write_pose_features(pose.process(ctx.rgb()), out)
+
+def extract_video_features(video_path, max_frames=MAX_FRAMES_PER_VIDEO):
+    """Run YOLO + MediaPipe on up to max_frames frames, returning a (frames, 92) array.
+
+    init_extractors must have run in this process.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"❌ Could not open video: {video_path}")
+        return None
+
+    # Landmarks are written straight into preallocated float32 rows
+    features = np.zeros((max_frames, FEATURE_SIZE), dtype=np.float32)
+    count = 0
+    while count < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        try:
+            results = yolo_model(frame)
+            bbox = None
+            if len(results[0].boxes) > 0:
+                bbox = results[0].boxes[0].xyxy[0].cpu().numpy().astype(int)
+
+            # Pose first converts the whole frame once; the hand crop is then a view of it
+            ctx = FrameContext(frame)
+            row = features[count]
+            extract_pose_landmarks(ctx, row[HAND_FEATURES:])
+            extract_hand_landmarks(ctx, bbox, row[:HAND_FEATURES])
+            count += 1
+        except Exception as e:
+            print(f"⚠️ Error processing frame {count}: {e}")
+            continue
+
+    cap.release()
+    return features[:count].copy()
+
+def save_to_cache(cache, video_path, features):
+    if cache is None or features is None:
+        return
+    try:
+        cache.save(video_path, features)
+    except OSError as e:
+        print(f"   ⚠️ Could not cache features for {video_path}: {e}")
+
+def extract_all_features(video_paths, yolo_path, workers=NUM_WORKERS, cache=None):
+    """Extract features for every clip, in parallel when workers > 1.
+
+    Returns a list aligned with video_paths holding (features, error) per clip,
+    so the dataset is assembled in the same order whatever finishes first.
+    The feature cache is only read and written here in the parent process;
+    workers just extract the clips that missed it.
+    """
+    results = [(None, None)] * len(video_paths)
+    total = len(video_paths)
+
+    misses = []
+    for i, video_path in enumerate(video_paths):
+        features = cache.load(video_path) if cache is not None else None
+        if features is not None:
+            results[i] = (features, None)
+        else:
+            misses.append(i)
+    if cache is not None:
+        print(f"💾 {total - len(misses)}/{total} clips loaded from the feature cache")
+    if not misses:
+        return results
+
+    if workers <= 1:
+        init_extractors(yolo_path)
+        for done, i in enumerate(misses, start=1):
+            print(f"   [{done}/{len(misses)}] Processing: {video_paths[i]}")
+            try:
+                features = extract_video_features(video_paths[i])
+                results[i] = (features, None)
+                save_to_cache(cache, video_paths[i], features)
+            except Exception as e:
+                results[i] = (None, str(e))
+        return results
+
+    print(f"⚙️ Extracting {len(misses)} clips with {workers} worker processes...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_extractors, initargs=(yolo_path, True)) as executor:
+        futures = {executor.submit(extract_video_features, video_paths[i]): i for i in misses}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                features = future.result()
+                results[i] = (features, None)
+                save_to_cache(cache, video_paths[i], features)
+                frames = 0 if features is None else len(features)
+                print(f"   [{done}/{len(misses)}] ✅ {video_paths[i]}: {frames} frames")
+            except Exception as e:
+                results[i] = (None, str(e))
+                print(f"   [{done}/{len(misses)}] ⚠️ {video_paths[i]}: {e}")
+    return results
@@ -0,0 +1,47 @@
+import numpy as np
+
+
+class FeatureWindow:
+    """Fixed-size sliding window of per-frame feature rows.
+
+    Rows live in a preallocated float32 array of twice the window length. Each
+    row is written both at the write index and one window further on, so the
+    last `length` rows are always available as a single contiguous slice and
+    handing the window to the model needs no copy or allocation.
+    """
+
+    def __init__(self, length, feature_size, dtype=np.float32):
+        self.length = length
+        self.feature_size = feature_size
+        self.storage = np.zeros((2 * length, feature_size), dtype=dtype)
+        self.index = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def is_full(self):
+        return self.count == self.length
+
+    def append(self, row):
+        self.storage[self.index] = row
+        self.storage[self.index + self.length] = row
+        self.index = (self.index + 1) % self.length
+        self.count = min(self.count + 1, self.length)
+
+    def clear(self):
+        self.storage.fill(0.0)
+        self.index = 0
+        self.count = 0
+
+    def latest(self):
+        """View of the most recently appended row"""
+        return self.storage[self.index + self.length - 1]
+
+    def window(self):
+        """Contiguous (length, feature_size) view, oldest row first"""
+        return self.storage[self.index:self.index + self.length]
+
+    def batch(self):
+        """The window as a (1, length, feature_size) view ready for the model"""
+        return self.window()[np.newaxis]
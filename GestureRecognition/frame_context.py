@@ -0,0 +1,60 @@
+import time
+
+import cv2
+
+
+class FrameContext:
+    """One captured frame plus the derived images the detection stages share.
+
+    Every derived image (full-resolution RGB, downscaled copies) is computed
+    at most once and only when a stage asks for it, so YOLO and pose share a
+    single downscale and the hands crop is a view whenever the full RGB frame
+    already exists. Once features are extracted, overlays are drawn straight
+    onto `frame` instead of onto a copy; nothing reads the clean pixels after
+    that point.
+    """
+
+    def __init__(self, frame, mirror=False, captured_at=None):
+        self.captured_at = time.time() if captured_at is None else captured_at
+        self.frame = cv2.flip(frame, 1) if mirror else frame
+        self._rgb = None
+        self._small = {}
+        self._small_rgb = {}
+
+    @property
+    def shape(self):
+        return self.frame.shape
+
+    def rgb(self):
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    def rgb_crop(self, box):
+        """RGB pixels inside an (x1, y1, x2, y2) box: a view when full RGB exists, else only the crop is converted"""
+        x1, y1, x2, y2 = box
+        if self._rgb is not None:
+            return self._rgb[y1:y2, x1:x2]
+        return cv2.cvtColor(self.frame[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+
+    def small(self, scale):
+        """BGR frame downscaled by `scale` (the frame itself at 1.0)"""
+        if scale == 1.0:
+            return self.frame
+        if scale not in self._small:
+            h, w = self.frame.shape[:2]
+            self._small[scale] = cv2.resize(self.frame, (round(w * scale), round(h * scale)),
+                                            interpolation=cv2.INTER_AREA)
+        return self._small[scale]
+
+    def small_rgb(self, scale):
+        if scale == 1.0:
+            return self.rgb()
+        if scale not in self._small_rgb:
+            self._small_rgb[scale] = cv2.cvtColor(self.small(scale), cv2.COLOR_BGR2RGB)
+        return self._small_rgb[scale]
+
+
+def as_context(frame):
+    """Wrap a bare ndarray so the detector methods accept either"""
+    return frame if isinstance(frame, FrameContext) else FrameContext(frame)
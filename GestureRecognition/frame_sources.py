@@ -0,0 +1,175 @@
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Resolution requested from webcams unless the caller asks for another
+CAMERA_WIDTH = 1280
+CAMERA_HEIGHT = 720
+
+# Marks the end of a finite source in the frame queue
+END = object()
+
+
+class VideoCaptureReader:
+    """Webcam index, video file, or RTSP/HTTP URL through cv2.VideoCapture"""
+
+    def __init__(self, spec, width=None, height=None):
+        self.cap = cv2.VideoCapture(spec)
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps and fps > 0 else None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectoryReader:
+    """Sorted image files in a directory, one frame per file"""
+
+    def __init__(self, path, fps=None):
+        self.files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        self.index = 0
+        self.fps = fps
+
+    def isOpened(self):
+        return len(self.files) > 0
+
+    def read(self):
+        while self.index < len(self.files):
+            frame = cv2.imread(self.files[self.index])
+            self.index += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def release(self):
+        self.index = len(self.files)
+
+
+class FrameSource:
+    """Decodes frames on a background thread and hands them out through read().
+
+    Mirrors the cv2.VideoCapture read()/isOpened()/release() interface so the
+    detection loops can use any source.
+
+    Live sources (webcams and network streams) always keep only the newest
+    frame, so a slow consumer never makes the camera back up. Finite sources
+    (files and image directories) deliver every frame. In realtime mode they
+    are paced to the source frame rate; otherwise they run as fast as the
+    consumer can take them. fps_cap limits the delivered rate for any source.
+    """
+
+    def __init__(self, reader, live, fps_cap=None, realtime=False, queue_size=4):
+        self.reader = reader
+        self.live = live
+        self.min_interval = 1.0 / fps_cap if fps_cap else 0.0
+        if realtime and not live and reader.fps:
+            self.min_interval = max(self.min_interval, 1.0 / reader.fps)
+        self.frames = queue.Queue(maxsize=1 if live else queue_size)
+        self.stop_event = threading.Event()
+        self.finished = False
+        self.thread = None
+        if reader.isOpened():
+            self.thread = threading.Thread(target=self._decode_loop, name="frame-source", daemon=True)
+            self.thread.start()
+
+    def _put(self, item):
+        if self.live:
+            # Latest frame wins
+            while True:
+                try:
+                    self.frames.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        self.frames.get_nowait()
+                    except queue.Empty:
+                        pass
+        while not self.stop_event.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _decode_loop(self):
+        last_delivered = 0.0
+        try:
+            while not self.stop_event.is_set():
+                ret, frame = self.reader.read()
+                if not ret:
+                    break
+                if self.min_interval:
+                    now = time.monotonic()
+                    if self.live:
+                        # Keep draining the camera, only forward at the capped rate
+                        if now - last_delivered < self.min_interval:
+                            continue
+                    else:
+                        wait = last_delivered + self.min_interval - now
+                        if wait > 0:
+                            time.sleep(wait)
+                    last_delivered = time.monotonic()
+                self._put(frame)
+        finally:
+            self.reader.release()
+            self._put(END)
+
+    def isOpened(self):
+        return self.thread is not None
+
+    def read(self):
+        if self.finished or self.thread is None:
+            return False, None
+        while True:
+            try:
+                frame = self.frames.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if not self.thread.is_alive() and self.frames.empty():
+                    frame = END
+                    break
+        if frame is END:
+            self.finished = True
+            return False, None
+        return True, frame
+
+    def release(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+
+
+def open_source(spec, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps_cap=None, realtime=True):
+    """Open a frame source from a webcam index, video file, stream URL or image directory.
+
+    Resolution only applies to webcams. realtime=False lets files and image
+    directories run as fast as the consumer allows.
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        reader = VideoCaptureReader(int(spec), width, height)
+        live = True
+    elif isinstance(spec, str) and '://' in spec:
+        reader = VideoCaptureReader(spec)
+        live = True
+    elif os.path.isdir(spec):
+        reader = ImageDirectoryReader(spec, fps=fps_cap)
+        live = False
+    else:
+        reader = VideoCaptureReader(spec)
+        live = False
+    return FrameSource(reader, live, fps_cap=fps_cap, realtime=realtime)
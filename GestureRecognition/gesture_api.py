@@ -1,13 +1,12 @@
 import threading
-import time
 import asyncio
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, WebSocket, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from typing import List
-from testingModelWebcamOnly import GestureDetector
-from fastapi.responses import StreamingResponse
-import cv2
+from detection_service import StreamManager
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from metrics import MetricsWriter
 
 app = FastAPI()
 app.add_middleware(
@@ -18,51 +17,133 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-latest_gesture = {"gesture": "No gesture detected", "confidence": 0.0}
-latest_frame = None
-
-def gesture_detection_thread():
-    global latest_gesture, latest_frame
-    model_path = "TwoModels/gesture_model.h5"
-    yolo_path = "TwoModels/best.pt"
-    detector = GestureDetector(model_path, yolo_path)
-    for gesture, confidence, frame in detector.run_generator_with_frame():
-        if gesture is not None:
-            latest_gesture = {"gesture": gesture, "confidence": float(confidence)}
-        else:
-            latest_gesture = {"gesture": "No gesture detected", "confidence": 0.0}
-        latest_frame = frame
-        time.sleep(0.1)
-
-def mjpeg_stream():
-    global latest_frame
-    while True:
-        if latest_frame is not None:
-            ret, jpeg = cv2.imencode('.jpg', latest_frame)
-            if ret:
-                frame_bytes = jpeg.tobytes()
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-        time.sleep(0.05)
+# Named video streams, one detector per camera/court. Each value is anything
+# open_source accepts: webcam index, video file, RTSP/HTTP URL or frame directory,
+# or a dict that also sets the webcam resolution (default 1280x720), e.g.
+#     "court2": {"source": 2, "width": 1920, "height": 1080},
+# The first stream is also served on the unnamed /ws/gesture and /video_feed.
+STREAMS = {
+    "default": 1,
+}
+DEFAULT_STREAM = next(iter(STREAMS))
+
+# /video_feed streaming tiers (?tier=...). Each tier encodes each frame at most
+# once for all of its viewers, and only while it has viewers.
+STREAM_TIERS = {
+    "thumbnail": {"width": 320, "jpeg_quality": 60, "max_fps": 5},
+    "480p": {"width": 854, "jpeg_quality": 75, "max_fps": 15},
+    "full": {"width": None, "jpeg_quality": 95, "max_fps": None},
+}
+DEFAULT_STREAM_TIER = "full"
+
+# Run capture, YOLO, landmarks and classifier as separate threaded stages
+PIPELINE_MODE = True
+
+# Gesture classifier backend: "keras", "tf_function", "numpy" (no TensorFlow import),
+# or "onnx"/"tflite" with MODEL_PATH pointing at a file from export_models.py
+CLASSIFIER_BACKEND = "tf_function"
+MODEL_PATH = "TwoModels/gesture_model.h5"
+
+# YOLO backend: "ultralytics" (.pt, or exported .onnx/.tflite) or "onnx" (ONNX Runtime only, no torch)
+YOLO_BACKEND = "ultralytics"
+YOLO_PATH = "TwoModels/best.pt"
+
+# Batch YOLO and classifier calls across streams into one forward pass each.
+# A batch runs whatever calls are queued as soon as the model is free, so no
+# stream waits for the others; BATCH_WINDOW_MS only caps collecting a batch
+BATCH_INFERENCE = len(STREAMS) > 1
+BATCH_WINDOW_MS = 5
+
+# Auto-reload on code changes (development only: every reload loads all models again)
+RELOAD = False
+
+# Model weights are loaded once and shared by all streams
+stream_manager = StreamManager(STREAMS, STREAM_TIERS, MODEL_PATH, YOLO_PATH, backend=CLASSIFIER_BACKEND,
+                               yolo_backend=YOLO_BACKEND, pipeline_mode=PIPELINE_MODE,
+                               batch_inference=BATCH_INFERENCE, batch_window=BATCH_WINDOW_MS / 1000.0)
 
 @app.on_event("startup")
-def start_detection():
-    thread = threading.Thread(target=gesture_detection_thread, daemon=True)
+async def start_detection():
+    # Models load in the background; the server accepts connections right away
+    # and /readyz reports when gestures are flowing
+    stream_manager.attach(asyncio.get_running_loop())
+    thread = threading.Thread(target=stream_manager.start, daemon=True)
     thread.start()
 
+@app.get('/streams')
+def list_streams():
+    return {"streams": list(STREAMS), "default": DEFAULT_STREAM, "tiers": list(STREAM_TIERS)}
+
+@app.get('/healthz')
+def healthz():
+    # Liveness: the API answers; model and frame state are reported for humans
+    return {"status": "ok", **stream_manager.status()}
+
+@app.get('/readyz')
+def readyz():
+    # Ready once the models are loaded and every stream delivered a recent frame
+    status = stream_manager.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get('/metrics')
+def metrics():
+    writer = MetricsWriter()
+    stream_manager.write_metrics(writer)
+    return Response(writer.render(), media_type="text/plain; version=0.0.4")
+
 @app.websocket("/ws/gesture")
 async def websocket_endpoint(websocket: WebSocket):
+    await stream_gestures(websocket, DEFAULT_STREAM)
+
+@app.websocket("/ws/gesture/{stream}")
+async def stream_websocket_endpoint(websocket: WebSocket, stream: str):
+    await stream_gestures(websocket, stream)
+
+async def stream_gestures(websocket: WebSocket, stream_name: str):
+    stream = stream_manager.get(stream_name)
+    if stream is None:
+        await websocket.close(code=1008)
+        return
     await websocket.accept()
+    queue = stream.gesture_broadcaster.subscribe()
+    # Listen for the client while waiting for gestures, so a client that
+    # disconnects during a quiet spell is unsubscribed right away instead of
+    # on the next failed send
+    receive_task = asyncio.ensure_future(websocket.receive())
+    get_task = asyncio.ensure_future(queue.get())
     try:
         while True:
-            await websocket.send_json(latest_gesture)
-            await asyncio.sleep(0.2)
+            done, _ = await asyncio.wait({get_task, receive_task}, return_when=asyncio.FIRST_COMPLETED)
+            if receive_task in done:
+                if receive_task.result()["type"] == "websocket.disconnect":
+                    break
+                # Messages from the client carry nothing; keep listening
+                receive_task = asyncio.ensure_future(websocket.receive())
+            if get_task in done:
+                await websocket.send_json(get_task.result())
+                get_task = asyncio.ensure_future(queue.get())
     except Exception:
         pass
+    finally:
+        receive_task.cancel()
+        get_task.cancel()
+        stream.gesture_broadcaster.unsubscribe(queue)
 
 @app.get('/video_feed')
-def video_feed():
-    return StreamingResponse(mjpeg_stream(), media_type='multipart/x-mixed-replace; boundary=frame')
+async def video_feed(tier: str = DEFAULT_STREAM_TIER):
+    return stream_video(DEFAULT_STREAM, tier)
+
+@app.get('/video_feed/{stream}')
+async def stream_video_feed(stream: str, tier: str = DEFAULT_STREAM_TIER):
+    return stream_video(stream, tier)
+
+def stream_video(stream_name: str, tier: str):
+    stream = stream_manager.get(stream_name)
+    if stream is None:
+        raise HTTPException(status_code=404, detail=f"Unknown stream '{stream_name}', choose from {list(STREAMS)}")
+    if tier not in stream.mjpeg_broadcasters:
+        raise HTTPException(status_code=400, detail=f"Unknown tier '{tier}', choose from {list(STREAM_TIERS)}")
+    return StreamingResponse(stream.mjpeg_broadcasters[tier].stream(), media_type='multipart/x-mixed-replace; boundary=frame')
 
 if __name__ == "__main__":
-    uvicorn.run("gesture_api:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    uvicorn.run("gesture_api:app", host="0.0.0.0", port=8000, reload=RELOAD)
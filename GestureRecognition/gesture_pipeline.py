@@ -0,0 +1,213 @@
+import queue
+import threading
+import time
+
+from frame_context import FrameContext
+from frame_sources import CAMERA_HEIGHT, CAMERA_WIDTH, open_source
+
+# Sentinel pushed through the stages when capture ends
+STOP = object()
+
+
+def put_latest(q, item):
+    """Put an item on a bounded queue, dropping the oldest entry when it is full"""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+class GesturePipeline:
+    """Staged capture -> YOLO -> landmarks -> classifier engine for a GestureDetector.
+
+    Each stage runs on its own thread and hands work to the next one through a
+    small bounded queue. For live sources, when a downstream stage falls
+    behind the oldest pending frame is dropped, so the camera never backs up
+    and the classifier always works on the most recent frame. Finite sources
+    (files, frame directories) deliver every frame, as FrameSource promises:
+    stages wait for the next one instead of dropping, so the classifier sees
+    evenly spaced windows. Throughput is bounded by the slowest stage instead
+    of the sum of all of them.
+    """
+
+    def __init__(self, detector, source=1, realtime=True, fps_cap=None, mirror=True, queue_size=1,
+                 width=CAMERA_WIDTH, height=CAMERA_HEIGHT):
+        self.detector = detector
+        self.source = source
+        self.width = width
+        self.height = height
+        self.realtime = realtime
+        self.fps_cap = fps_cap
+        self.mirror = mirror
+        # Set from the opened source in start()
+        self.live = True
+
+        self.capture_queue = queue.Queue(maxsize=queue_size)
+        self.detect_queue = queue.Queue(maxsize=queue_size)
+        self.landmark_queue = queue.Queue(maxsize=queue_size)
+        self.output_queue = queue.Queue(maxsize=queue_size)
+
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.dropped_frames = 0
+        self.stage_errors = 0
+        # Glass-to-gesture latency of the most recently yielded frame, in seconds
+        self.last_latency = 0.0
+
+    def queue_depths(self):
+        return {
+            'capture': self.capture_queue.qsize(),
+            'detect': self.detect_queue.qsize(),
+            'landmark': self.landmark_queue.qsize(),
+            'output': self.output_queue.qsize(),
+        }
+
+    def _forward(self, q, item):
+        if self.live:
+            # Latest frame wins
+            if item is not STOP and q.full():
+                self.dropped_frames += 1
+            put_latest(q, item)
+            return
+        # Backpressure: wait for the next stage rather than drop a frame
+        while not self.stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q):
+        """Block until an item is available or the pipeline is stopped"""
+        while not self.stop_event.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return STOP
+
+    def _capture_stage(self, cap):
+        try:
+            while not self.stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    print("❌ Could not read frame")
+                    break
+
+                # Flip frame horizontally for mirror effect; later stages share its derived images
+                self._forward(self.capture_queue, FrameContext(frame, mirror=self.mirror))
+        finally:
+            cap.release()
+            self._forward(self.capture_queue, STOP)
+
+    def _detect_stage(self):
+        while True:
+            item = self._get(self.capture_queue)
+            if item is STOP:
+                break
+            ctx = item
+            try:
+                bbox = self.detector.detect_bbox(ctx)
+            except Exception as e:
+                print(f"⚠️ Error in YOLO stage: {e}")
+                self.stage_errors += 1
+                bbox = None
+            self._forward(self.detect_queue, (ctx, bbox))
+        self._forward(self.detect_queue, STOP)
+
+    def _landmark_stage(self):
+        while True:
+            item = self._get(self.detect_queue)
+            if item is STOP:
+                break
+            ctx, bbox = item
+            try:
+                landmarks = self.detector.process_landmarks(ctx, bbox)
+            except Exception as e:
+                print(f"⚠️ Error in landmark stage: {e}")
+                self.stage_errors += 1
+                landmarks = None
+            self._forward(self.landmark_queue, (ctx, bbox, landmarks))
+        self._forward(self.landmark_queue, STOP)
+
+    def _classify_stage(self):
+        detector = self.detector
+        while True:
+            item = self._get(self.landmark_queue)
+            if item is STOP:
+                break
+            ctx, bbox, landmarks = item
+            gesture, confidence = None, 0.0
+            hands_results = pose_results = hand_box = None
+            try:
+                if landmarks is not None:
+                    combined_features, hands_results, pose_results, hand_box = landmarks
+                    detector.add_features(combined_features)
+                    gesture, confidence = detector.predict_gesture()
+            except Exception as e:
+                print(f"⚠️ Error in classifier stage: {e}")
+                self.stage_errors += 1
+
+            # The earlier stages are done with this frame, so draw on it in place;
+            # headless (nobody watching) frames are passed on as None
+            annotated_frame = None
+            if detector.should_annotate():
+                try:
+                    annotated_frame = detector.annotate(ctx, bbox, hands_results, pose_results, hand_box,
+                                                        gesture, confidence)
+                except Exception as e:
+                    print(f"⚠️ Error drawing frame: {e}")
+                    self.stage_errors += 1
+                    annotated_frame = ctx.frame
+            self._forward(self.output_queue, (gesture, confidence, annotated_frame, ctx.captured_at))
+        self._forward(self.output_queue, STOP)
+
+    def start(self):
+        cap = open_source(self.source, self.width, self.height, fps_cap=self.fps_cap, realtime=self.realtime)
+
+        if not cap.isOpened():
+            print(f"❌ Could not open video source: {self.source}")
+            return False
+
+        self.live = cap.live
+        self.stop_event.clear()
+        self.threads = [
+            threading.Thread(target=self._capture_stage, args=(cap,), name="capture", daemon=True),
+            threading.Thread(target=self._detect_stage, name="yolo", daemon=True),
+            threading.Thread(target=self._landmark_stage, name="landmarks", daemon=True),
+            threading.Thread(target=self._classify_stage, name="classifier", daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        return True
+
+    def stop(self):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout=2.0)
+        self.threads = []
+
+    def run_with_frame(self):
+        """Generator that yields gesture, confidence, and annotated frame continuously"""
+        if not self.start():
+            return
+
+        print("🎥 Starting pipelined gesture detection...")
+
+        try:
+            while True:
+                item = self._get(self.output_queue)
+                if item is STOP:
+                    break
+                gesture, confidence, annotated_frame, captured_at = item
+                self.last_latency = time.time() - captured_at
+                yield gesture, confidence, annotated_frame
+        except KeyboardInterrupt:
+            print("🛑 Gesture detection stopped by user")
+        finally:
+            self.stop()
@@ -0,0 +1,304 @@
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Gesture classifier backends. Every backend exposes predict(sequence), taking
+# a (1, sequence length, features) float32 array and returning the class
+# probabilities for that window. Only the Keras based ones import TensorFlow;
+# the ONNX and TFLite ones run models written by export_models.py.
+
+
+class KerasPredictBackend:
+    """Plain model.predict, the original inference path"""
+
+    def __init__(self, model_path):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(model_path)
+
+    def predict(self, sequence):
+        return self.model.predict(sequence, verbose=0)[0]
+
+    def predict_batch(self, sequences):
+        return list(self.model.predict(np.concatenate(sequences), verbose=0))
+
+
+class TFFunctionBackend:
+    """Calls the Keras model through a compiled tf.function, skipping predict's batching machinery"""
+
+    def __init__(self, model_path):
+        import tensorflow as tf
+        from tensorflow.keras.models import load_model
+        self.model = load_model(model_path)
+        feature_size = self.model.input_shape[-1]
+        sequence_length = self.model.input_shape[1]
+        self._forward = tf.function(
+            lambda x: self.model(x, training=False),
+            input_signature=[tf.TensorSpec((1, sequence_length, feature_size), tf.float32)],
+        )
+        # Separate trace for cross-stream batches so the batch-1 path keeps its fixed shape
+        self._forward_batch = tf.function(
+            lambda x: self.model(x, training=False),
+            input_signature=[tf.TensorSpec((None, sequence_length, feature_size), tf.float32)],
+        )
+
+    def predict(self, sequence):
+        return self._forward(np.asarray(sequence, dtype=np.float32)).numpy()[0]
+
+    def predict_batch(self, sequences):
+        batch = np.concatenate(sequences).astype(np.float32, copy=False)
+        return list(self._forward_batch(batch).numpy())
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+def _relu(x):
+    return np.maximum(x, 0.0)
+
+
+def _softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+def _linear(x):
+    return x
+
+
+ACTIVATIONS = {
+    'sigmoid': _sigmoid,
+    'hard_sigmoid': _hard_sigmoid,
+    'tanh': np.tanh,
+    'relu': _relu,
+    'softmax': _softmax,
+    'linear': _linear,
+}
+
+
+def _activation(config, key, default):
+    name = config.get(key, default)
+    if isinstance(name, dict):
+        # Newer Keras versions serialize activations as objects
+        name = name.get('config', {}).get('name', name.get('class_name'))
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {name}")
+    return ACTIVATIONS[name]
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def read_h5_layers(model_path):
+    """Read layer configs and weights of a Keras .h5 model with h5py only.
+
+    Returns a list of (class_name, config, weights) tuples in model order.
+    InputLayer and Dropout are skipped since they do nothing at inference.
+    """
+    import h5py
+
+    with h5py.File(model_path, 'r') as f:
+        model_config = json.loads(_decode(f.attrs['model_config']))
+        weights_group = f['model_weights'] if 'model_weights' in f else f
+
+        layers = []
+        for layer in model_config['config']['layers']:
+            class_name, config = layer['class_name'], layer['config']
+            if class_name in ('InputLayer', 'Dropout'):
+                continue
+            group = weights_group[config['name']]
+            weight_names = [_decode(n) for n in group.attrs['weight_names']]
+            weights = [np.array(group[name], dtype=np.float32) for name in weight_names]
+            layers.append((class_name, config, weights))
+    return layers
+
+
+class NumpyLSTMBackend:
+    """Pure NumPy forward pass of the LSTM/Dense classifier, built from the .h5 weights.
+
+    Needs only numpy and h5py, so the API process can classify gestures
+    without importing TensorFlow at all.
+    """
+
+    def __init__(self, model_path):
+        self.layers = []
+        for class_name, config, weights in read_h5_layers(model_path):
+            if class_name == 'LSTM':
+                kernel, recurrent_kernel, bias = weights
+                self.layers.append(('LSTM', {
+                    'kernel': kernel,
+                    'recurrent_kernel': recurrent_kernel,
+                    'bias': bias,
+                    'units': recurrent_kernel.shape[0],
+                    'return_sequences': config.get('return_sequences', False),
+                    'activation': _activation(config, 'activation', 'tanh'),
+                    'recurrent_activation': _activation(config, 'recurrent_activation', 'sigmoid'),
+                }))
+            elif class_name == 'Dense':
+                kernel, bias = weights
+                self.layers.append(('Dense', {
+                    'kernel': kernel,
+                    'bias': bias,
+                    'activation': _activation(config, 'activation', 'linear'),
+                }))
+            else:
+                raise ValueError(f"Unsupported layer for NumPy backend: {class_name}")
+
+    @staticmethod
+    def _lstm(x, layer):
+        # x: (batch, timesteps, features). Input projections for all steps in one
+        # matmul, then the recurrence; gate order is Keras' i, f, c, o
+        units = layer['units']
+        activation = layer['activation']
+        recurrent_activation = layer['recurrent_activation']
+        projected = x @ layer['kernel'] + layer['bias']
+        recurrent_kernel = layer['recurrent_kernel']
+
+        batch, timesteps = x.shape[:2]
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, timesteps, units), dtype=np.float32)
+        for t in range(timesteps):
+            z = projected[:, t] + h @ recurrent_kernel
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = recurrent_activation(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * activation(c)
+            outputs[:, t] = h
+        return outputs if layer['return_sequences'] else h
+
+    def _forward(self, x):
+        for kind, layer in self.layers:
+            if kind == 'LSTM':
+                x = self._lstm(x, layer)
+            else:
+                x = layer['activation'](x @ layer['kernel'] + layer['bias'])
+        return x
+
+    def predict(self, sequence):
+        return self._forward(np.asarray(sequence, dtype=np.float32))[0]
+
+    def predict_batch(self, sequences):
+        return list(self._forward(np.concatenate(sequences).astype(np.float32, copy=False)))
+
+
+class OnnxBackend:
+    """ONNX Runtime on CPU, for a classifier exported with export_models.py"""
+
+    def __init__(self, model_path, num_threads=None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, sequence):
+        return self.session.run(None, {self.input_name: np.asarray(sequence, dtype=np.float32)})[0][0]
+
+
+class TFLiteBackend:
+    """TFLite interpreter, using the small tflite_runtime package when it is installed"""
+
+    def __init__(self, model_path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            # tf.lite is an attribute, not an importable module, in recent TensorFlow
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.output_detail = self.interpreter.get_output_details()[0]
+
+    def predict(self, sequence):
+        sequence = np.asarray(sequence, dtype=np.float32)
+        input_scale, input_zero_point = self.input_detail['quantization']
+        if self.input_detail['dtype'] != np.float32 and input_scale:
+            # Fully int8 model: quantize the input and dequantize the output
+            sequence = np.round(sequence / input_scale + input_zero_point).astype(self.input_detail['dtype'])
+        self.interpreter.set_tensor(self.input_detail['index'], sequence)
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self.output_detail['index'])[0]
+        output_scale, output_zero_point = self.output_detail['quantization']
+        if self.output_detail['dtype'] != np.float32 and output_scale:
+            output = (output.astype(np.float32) - output_zero_point) * output_scale
+        return output
+
+
+class SharedClassifier:
+    """Lets several detectors share one loaded classifier, serializing predict calls"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.model = getattr(backend, 'model', None)
+        self.lock = threading.Lock()
+
+    def predict(self, sequence):
+        with self.lock:
+            return self.backend.predict(sequence)
+
+
+BACKENDS = {
+    'keras': KerasPredictBackend,
+    'tf_function': TFFunctionBackend,
+    'numpy': NumpyLSTMBackend,
+    'onnx': OnnxBackend,
+    'tflite': TFLiteBackend,
+}
+
+
+def load_backend(name, model_path):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{name}', choose from {sorted(BACKENDS)}")
+    return BACKENDS[name](model_path)
+
+
+def compare_backends(model_path, backends=None, windows=50, repeats=3):
+    """Check each backend against model.predict on random windows and time it.
+
+    `backends` maps backend names to the model file they load; by default the
+    .h5 based ones are compared.
+    """
+    if backends is None:
+        backends = {'tf_function': model_path, 'numpy': model_path}
+    rng = np.random.default_rng(0)
+    reference = KerasPredictBackend(model_path)
+    sequences = rng.random((windows, 1) + tuple(reference.model.input_shape[1:]), dtype=np.float32)
+    expected = [reference.predict(sequence) for sequence in sequences]
+
+    results = {}
+    for name, path in [('keras', model_path)] + list(backends.items()):
+        backend = reference if name == 'keras' else load_backend(name, path)
+        outputs = [backend.predict(sequence) for sequence in sequences]  # also warms up
+        max_diff = max(float(np.max(np.abs(out - exp))) for out, exp in zip(outputs, expected))
+        agreement = sum(int(np.argmax(out) == np.argmax(exp)) for out, exp in zip(outputs, expected))
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for sequence in sequences:
+                backend.predict(sequence)
+        ms_per_call = (time.perf_counter() - start) / (repeats * windows) * 1000
+
+        results[name] = {'max_abs_diff': max_diff, 'argmax_agreement': agreement / windows, 'ms_per_call': ms_per_call}
+        print(f"{name:12} | max diff: {max_diff:.2e} | argmax agreement: {agreement}/{windows} | {ms_per_call:.2f} ms/call")
+    return results
+
+
+if __name__ == "__main__":
+    # Usage: python inference_backends.py [model.h5] [backend=path ...]
+    #   e.g. python inference_backends.py TwoModels/gesture_model.h5 numpy=TwoModels/gesture_model.h5 onnx=TwoModels/gesture_model.onnx
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "TwoModels/gesture_model.h5"
+    extra = dict(arg.split('=', 1) for arg in sys.argv[2:])
+    compare_backends(model_path, extra or None)
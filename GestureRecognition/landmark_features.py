@@ -0,0 +1,77 @@
+import numpy as np
+
+# Per-frame feature layout, shared by training and inference
+HAND_FEATURES = 84  # 2 hands * 21 landmarks * 2 coords
+POSE_FEATURES = 8   # shoulders and elbows
+FEATURE_SIZE = HAND_FEATURES + POSE_FEATURES
+
+# Frames per classifier window
+SEQUENCE_LENGTH = 30
+
+HAND_LANDMARKS = 21
+POSE_INDICES = (11, 12, 13, 14)  # left/right shoulder, left/right elbow
+
+
+def clip_box(box, shape):
+    """Clamp an (x1, y1, x2, y2) YOLO box to a frame of `shape`, None when nothing valid is left"""
+    if box is None:
+        return None
+    x1, y1, x2, y2 = box
+    h, w = shape[:2]
+    x1, y1 = max(0, x1), max(0, y1)
+    x2, y2 = min(w, x2), min(h, y2)
+    if x2 > x1 and y2 > y1:
+        return x1, y1, x2, y2
+    return None
+
+
+def hand_image(ctx, hand_bbox=None):
+    """The RGB pixels the hands model runs on, and the clamped box they were cut from.
+
+    That is the YOLO crop when the box is usable, otherwise the whole frame
+    (box None). `ctx` is a FrameContext; training and inference both call this
+    so the hands model sees the same input in both.
+    """
+    box = clip_box(hand_bbox, ctx.shape)
+    return (ctx.rgb() if box is None else ctx.rgb_crop(box)), box
+
+
+def write_hand_features(result, out=None):
+    """Write MediaPipe hands output into an 84-float row.
+
+    Up to two hands in detection order, each as 21 (x, y) pairs; missing
+    hands stay zero. `out` is usually a slice of a preallocated float32
+    feature row; a new row is allocated when it is None. Returns `out`.
+    """
+    if out is None:
+        out = np.empty(HAND_FEATURES, dtype=np.float32)
+    out[:] = 0.0
+    if result.multi_hand_landmarks:
+        hands = out.reshape(2, HAND_LANDMARKS * 2)
+        for hand, hand_landmarks in zip(hands, result.multi_hand_landmarks):
+            hand[:] = np.fromiter((coord for lm in hand_landmarks.landmark for coord in (lm.x, lm.y)),
+                                  dtype=np.float32, count=HAND_LANDMARKS * 2)
+    return out
+
+
+def write_pose_features(result, out=None):
+    """Write the shoulder and elbow (x, y) pose landmarks into an 8-float row, zeros when no pose"""
+    if out is None:
+        out = np.empty(POSE_FEATURES, dtype=np.float32)
+    if result.pose_landmarks:
+        landmarks = result.pose_landmarks.landmark
+        for j, i in enumerate(POSE_INDICES):
+            out[2 * j] = landmarks[i].x
+            out[2 * j + 1] = landmarks[i].y
+    else:
+        out[:] = 0.0
+    return out
+
+
+def write_features(hands_result, pose_result, out=None):
+    """Fill a full FEATURE_SIZE row (hands, then pose) from MediaPipe results"""
+    if out is None:
+        out = np.empty(FEATURE_SIZE, dtype=np.float32)
+    write_hand_features(hands_result, out[:HAND_FEATURES])
+    write_pose_features(pose_result, out[HAND_FEATURES:])
+    return out
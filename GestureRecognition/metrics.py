@@ -0,0 +1,115 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency histogram bucket bounds in seconds (1 ms .. 2.5 s)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram, safe to observe from any thread"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self.lock:
+            self.count += 1
+            self.sum += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+
+    def snapshot(self):
+        """Cumulative (bound, count) pairs plus the total count and sum"""
+        with self.lock:
+            cumulative = []
+            running = 0
+            for bound, count in zip(self.buckets, self.bucket_counts):
+                running += count
+                cumulative.append((bound, running))
+            return cumulative, self.count, self.sum
+
+
+class StageMetrics:
+    """Drop-in for StageTimer on long-running detectors.
+
+    Same stage()/record() interface, but every stage feeds a fixed-size
+    histogram instead of keeping raw samples, so it can stay attached for a
+    whole match. Stages run on several pipeline threads at once.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        histogram.observe(seconds)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+class MetricsWriter:
+    """Builds a Prometheus text-format exposition.
+
+    Samples are grouped per metric family in the order families are first
+    used, so callers can emit metrics stream by stream.
+    """
+
+    def __init__(self, prefix="gesture_"):
+        self.prefix = prefix
+        self.families = {}
+
+    def _family(self, name, kind, help_text):
+        name = self.prefix + name
+        if name not in self.families:
+            self.families[name] = (kind, help_text, [])
+        return name, self.families[name][2]
+
+    def gauge(self, name, help_text, value, labels=None):
+        name, samples = self._family(name, "gauge", help_text)
+        samples.append(f"{name}{format_labels(labels)} {float(value)}")
+
+    def counter(self, name, help_text, value, labels=None):
+        name, samples = self._family(name, "counter", help_text)
+        samples.append(f"{name}{format_labels(labels)} {float(value)}")
+
+    def histogram(self, name, help_text, histogram, labels=None):
+        name, samples = self._family(name, "histogram", help_text)
+        labels = labels or {}
+        cumulative, count, total = histogram.snapshot()
+        for bound, bucket_count in cumulative:
+            samples.append(f"{name}_bucket{format_labels({**labels, 'le': bound})} {bucket_count}")
+        samples.append(f"{name}_bucket{format_labels({**labels, 'le': '+Inf'})} {count}")
+        samples.append(f"{name}_sum{format_labels(labels)} {total}")
+        samples.append(f"{name}_count{format_labels(labels)} {count}")
+
+    def render(self):
+        lines = []
+        for name, (kind, help_text, samples) in self.families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
@@ -1,154 +1,97 @@
 import os
-import cv2
 import numpy as np
-import mediapipe as mp
-from ultralytics import YOLO
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.utils import to_categorical
-from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
+from feature_cache import FeatureCache, file_sha256
+from feature_extraction import HANDS_SETTINGS, MAX_FRAMES_PER_VIDEO, NUM_WORKERS, POSE_SETTINGS, extract_all_features
+from landmark_features import FEATURE_SIZE, SEQUENCE_LENGTH
+from windowed_dataset import WindowedDataset
+
+# TensorFlow, scikit-learn and the plotting libraries are imported inside the
+# functions that use them: extraction workers re-import this module when they
+# are spawned, and must not pay for (or start threads from) any of them.
 
 # Updated gesture classes to match your actual folder names
 GESTURE_CLASSES = ['DynamicChangeOfCourt', 'DynamicServeLeft', 'DynamicServeRight', 'StaticBallOut', 'StaticEndOfMatch', 'StaticPointLeft', 'StaticPointRight']
-SEQUENCE_LENGTH = 30
-HAND_FEATURES = 84  # 2 hands * 21 landmarks * 2 coords
-POSE_FEATURES = 8   # shoulders and elbows
-FEATURE_SIZE = HAND_FEATURES + POSE_FEATURES
-
-# Load YOLOv9
-yolo_model = YOLO('C:/paul/mandapsfolder/softeng_mediapipe_yolo_training/best.pt')
-
-# Load MediaPipe
-mp_hands = mp.solutions.hands
-mp_pose = mp.solutions.pose
-hands = mp_hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5)
-pose = mp_pose.Pose(static_image_mode=False, min_detection_confidence=0.5, min_tracking_confidence=0.5)
 
-def extract_hand_landmarks(image, hand_bbox=None):
-    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    if hand_bbox is not None:
-        x1, y1, x2, y2 = hand_bbox
-        # Add bounds checking to prevent cropping errors
-        h, w = rgb.shape[:2]
-        x1, y1 = max(0, x1), max(0, y1)
-        x2, y2 = min(w, x2), min(h, y2)
-        if x2 > x1 and y2 > y1:  # Only crop if valid bbox
-            rgb = rgb[y1:y2, x1:x2]
-    
-    result = hands.process(rgb)
+YOLO_PATH = 'C:/paul/mandapsfolder/softeng_mediapipe_yolo_training/best.pt'
 
-    landmarks = []
-    if result.multi_hand_landmarks:
-        for hand_landmarks in result.multi_hand_landmarks:
-            points = [coord for lm in hand_landmarks.landmark for coord in (lm.x, lm.y)]
-            landmarks.append(points)
+# Landmark feature cache; bump FEATURE_VERSION when the feature layout changes
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'feature_cache')
+FEATURE_VERSION = 1
+USE_FEATURE_CACHE = True
 
-    while len(landmarks) < 2:
-        landmarks.append([0.0] * 42)
+_feature_cache = None
 
-    return np.array(landmarks[:2]).flatten()
-
-def extract_pose_landmarks(image):
-    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    result = pose.process(rgb)
-    if result.pose_landmarks:
-        indices = [11, 12, 13, 14]  # shoulders and elbows
-        return np.array([coord for i in indices for coord in (result.pose_landmarks.landmark[i].x, result.pose_landmarks.landmark[i].y)])
-    return np.zeros(POSE_FEATURES)
-
-def process_video(video_path):
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        print(f"❌ Could not open video: {video_path}")
-        return []
-    
-    features, count = [], 0
-    while count < 150:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        try:
-            results = yolo_model(frame)
-            bbox = None
-            if len(results[0].boxes) > 0:
-                bbox = results[0].boxes[0].xyxy[0].cpu().numpy().astype(int)
-            
-            hand = extract_hand_landmarks(frame, bbox)
-            pose_ = extract_pose_landmarks(frame)
-            features.append(np.concatenate([hand, pose_]))
-            count += 1
-        except Exception as e:
-            print(f"⚠️ Error processing frame {count}: {e}")
-            continue
-    
-    cap.release()
-
-    # Create sequences
-    sequences = []
-    if len(features) >= SEQUENCE_LENGTH:
-        for i in range(len(features) - SEQUENCE_LENGTH + 1):
-            sequences.append(features[i:i + SEQUENCE_LENGTH])
-    else:
-        print(f"⚠️ Not enough frames ({len(features)}) for sequence length {SEQUENCE_LENGTH}")
-    
-    return sequences
+def get_feature_cache():
+    global _feature_cache
+    if _feature_cache is None:
+        import mediapipe as mp
+        settings = {
+            'feature_version': FEATURE_VERSION,
+            'yolo_sha256': file_sha256(YOLO_PATH),
+            'mediapipe_version': getattr(mp, '__version__', 'unknown'),
+            'max_frames': MAX_FRAMES_PER_VIDEO,
+            'hands': HANDS_SETTINGS,
+            'pose': POSE_SETTINGS,
+        }
+        _feature_cache = FeatureCache(CACHE_DIR, settings)
+    return _feature_cache
 
-def prepare_dataset(dataset_path='C:/paul/mandapsfolder/softeng_mediapipe_yolo_training/'):
-    X, y = [], []
-    class_counts = {}
-    
+def prepare_dataset(dataset_path='C:/paul/mandapsfolder/softeng_mediapipe_yolo_training/', workers=NUM_WORKERS):
     # First, let's check what folders actually exist
     print(f"📂 Checking dataset path: {dataset_path}")
     if not os.path.exists(dataset_path):
         print(f"❌ Dataset path does not exist: {dataset_path}")
-        return np.array([]), np.array([]).reshape(0, len(GESTURE_CLASSES)), {}
+        empty = WindowedDataset.from_clips([], [], SEQUENCE_LENGTH, FEATURE_SIZE)
+        return empty, np.array([]).reshape(0, len(GESTURE_CLASSES)), {}
     
     available_folders = [f for f in os.listdir(dataset_path) if os.path.isdir(os.path.join(dataset_path, f))]
     print(f"📁 Available folders: {available_folders}")
     
+    # Collect clips in a deterministic order
+    clips = []
     for idx, cls in enumerate(GESTURE_CLASSES):
         folder = os.path.join(dataset_path, cls)
         if not os.path.isdir(folder):
             print(f"❌ Missing folder: {cls}")
-            class_counts[cls] = 0
             continue
         
-        print(f"📂 Processing {cls}...")
-        video_files = [f for f in os.listdir(folder) if f.lower().endswith(('.mp4', '.mov', '.avi'))]
-        print(f"   Found {len(video_files)} video files")
-        
-        sequences_for_class = 0
-        for file in video_files:
-            video_path = os.path.join(folder, file)
-            print(f"   Processing: {file}")
-            try:
-                sequences = process_video(video_path)
-                if sequences:
-                    X.extend(sequences)
-                    y.extend([idx] * len(sequences))
-                    sequences_for_class += len(sequences)
-                    print(f"   ✅ Added {len(sequences)} sequences")
-                else:
-                    print(f"   ⚠️ No sequences extracted from {file}")
-            except Exception as e:
-                print(f"   ⚠️ Error in {file}: {e}")
-        
-        class_counts[cls] = sequences_for_class
-        print(f"   📊 Total sequences for {cls}: {sequences_for_class}")
+        video_files = sorted(f for f in os.listdir(folder) if f.lower().endswith(('.mp4', '.mov', '.avi')))
+        print(f"📂 {cls}: found {len(video_files)} video files")
+        clips.extend((idx, cls, os.path.join(folder, file)) for file in video_files)
+    
+    cache = get_feature_cache() if USE_FEATURE_CACHE else None
+    results = extract_all_features([path for _, _, path in clips], YOLO_PATH, workers, cache)
+    
+    # Keep each clip's frames once; windows are built lazily by WindowedDataset
+    clip_features, clip_labels = [], []
+    class_counts = {cls: 0 for cls in GESTURE_CLASSES}
+    for (idx, cls, video_path), (features, error) in zip(clips, results):
+        file = os.path.basename(video_path)
+        if error is not None:
+            print(f"   ⚠️ Error in {cls}/{file}: {error}")
+            continue
+        if features is None or len(features) < SEQUENCE_LENGTH:
+            frames = 0 if features is None else len(features)
+            print(f"   ⚠️ No sequences extracted from {cls}/{file} ({frames} frames)")
+            continue
+        clip_features.append(features)
+        clip_labels.append(idx)
+        class_counts[cls] += len(features) - SEQUENCE_LENGTH + 1
     
-    if len(X) == 0:
-        return np.array([]), np.array([]).reshape(0, len(GESTURE_CLASSES)), class_counts
+    for cls in GESTURE_CLASSES:
+        print(f"   📊 Total sequences for {cls}: {class_counts[cls]}")
     
-    return np.array(X), to_categorical(np.array(y), num_classes=len(GESTURE_CLASSES)), class_counts
+    dataset = WindowedDataset.from_clips(clip_features, clip_labels, SEQUENCE_LENGTH, FEATURE_SIZE)
+    if len(dataset) == 0:
+        return dataset, np.array([]).reshape(0, len(GESTURE_CLASSES)), class_counts
+    
+    from tensorflow.keras.utils import to_categorical
+    return dataset, to_categorical(dataset.labels, num_classes=len(GESTURE_CLASSES)), class_counts
 
 def build_model():
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense, Dropout
+    from tensorflow.keras.optimizers import Adam
     model = Sequential([
         LSTM(128, return_sequences=True, input_shape=(SEQUENCE_LENGTH, FEATURE_SIZE)),
         Dropout(0.2),
@@ -164,6 +107,7 @@ def build_model():
     return model
 
 def plot_training(history):
+    import matplotlib.pyplot as plt
     fig, ((acc, loss), (lr, val_metrics)) = plt.subplots(2, 2, figsize=(15, 10))
     
     # Accuracy plot
@@ -222,6 +166,9 @@ def plot_training(history):
     plt.show()
 
 def plot_confusion_matrix(y_true, y_pred, class_names):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.metrics import confusion_matrix
     cm = confusion_matrix(y_true, y_pred)
     
     plt.figure(figsize=(10, 8))
@@ -238,6 +185,7 @@ def plot_confusion_matrix(y_true, y_pred, class_names):
     return cm
 
 def analyze_model_performance(model, X_test, y_test, class_names):
+    from sklearn.metrics import classification_report, accuracy_score
     print("\n" + "="*60)
     print("🎯 DETAILED MODEL PERFORMANCE ANALYSIS")
     print("="*60)
@@ -318,6 +266,10 @@ def analyze_model_performance(model, X_test, y_test, class_names):
     }
 
 def main():
+    from sklearn.model_selection import train_test_split
+    from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+    from window_sequence import WindowSequence
+    
     print("🚀 Preparing dataset...")
     X, y, class_counts = prepare_dataset()
     print(f"✅ Data shape: X={X.shape}, y={y.shape}")
@@ -345,9 +297,12 @@ def main():
         print("❌ Need at least 2 different classes for training")
         return
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, stratify=y.argmax(axis=1), random_state=42
+    # Split window indices; the windows themselves stay views into X's frame storage
+    train_idx, test_idx = train_test_split(
+        np.arange(len(X)), test_size=0.2, stratify=y.argmax(axis=1), random_state=42
     )
+    X_train, X_test = X.subset(train_idx), X.subset(test_idx)
+    y_train, y_test = y[train_idx], y[test_idx]
     
     print(f"\n📊 DATA SPLIT:")
     print(f"Training set: {X_train.shape[0]} samples")
@@ -365,10 +320,9 @@ def main():
     
     print("\n📈 Training model...")
     history = model.fit(
-        X_train, y_train, 
+        WindowSequence(X_train, y_train, batch_size=32, shuffle=True), 
         epochs=11, 
-        batch_size=32, 
-        validation_data=(X_test, y_test), 
+        validation_data=WindowSequence(X_test, y_test, batch_size=32), 
         callbacks=callbacks,
         verbose=1
     )
@@ -379,7 +333,7 @@ def main():
     print(f"\n💾 Model saved to {model_path}")
     
     # Comprehensive performance analysis
-    performance_metrics = analyze_model_performance(model, X_test, y_test, GESTURE_CLASSES)
+    performance_metrics = analyze_model_performance(model, WindowSequence(X_test, batch_size=256), y_test, GESTURE_CLASSES)
     
     # Plot training history
     plot_training(history)
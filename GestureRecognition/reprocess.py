@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from frame_context import FrameContext
+from frame_sources import FrameSource, VideoCaptureReader
+from landmark_features import SEQUENCE_LENGTH
+from testingModelWebcamOnly import GestureDetector
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv')
+
+# Each worker process holds a full GestureDetector (TensorFlow, torch, MediaPipe:
+# several GB of RSS), so only a few run at once and they split the cores
+NUM_WORKERS = 2
+
+# Frames decoded before a segment starts so its feature buffer and smoothing are
+# already warm at the first reported frame; they are processed but not reported
+PREROLL_FRAMES = 2 * SEQUENCE_LENGTH
+
+# Created per worker process by init_worker
+detector = None
+
+
+def limit_threads(detector_options, threads):
+    """Cap the intra-op thread pools of this process's libraries to `threads`"""
+    cv2.setNumThreads(threads)
+    if detector_options.get('yolo_backend', 'ultralytics') == 'ultralytics':
+        import torch
+        torch.set_num_threads(threads)
+    if detector_options.get('backend', 'tf_function') in ('keras', 'tf_function'):
+        # Must happen before TensorFlow initializes, i.e. before the model loads
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def init_worker(detector_options, threads=None):
+    global detector
+    if detector is None:
+        if threads:
+            limit_threads(detector_options, threads)
+        detector = GestureDetector(**detector_options)
+
+
+def video_info(video_path):
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return (fps if fps and fps > 0 else 30.0), max(0, frame_count)
+
+
+def plan_segments(video_paths, segment_seconds=None):
+    """Split videos into (video_path, start_frame, end_frame, fps) tasks.
+
+    end_frame is None for "until the end of the video". Without
+    segment_seconds, or when the frame count is unknown, each video is one task.
+    """
+    tasks = []
+    for video_path in video_paths:
+        fps, frame_count = video_info(video_path)
+        if not segment_seconds or frame_count <= 0:
+            tasks.append((video_path, 0, None, fps))
+            continue
+        segment_frames = max(SEQUENCE_LENGTH, int(round(segment_seconds * fps)))
+        for start in range(0, frame_count, segment_frames):
+            end = start + segment_frames
+            tasks.append((video_path, start, end if end < frame_count else None, fps))
+    return tasks
+
+
+def gesture_events(predictions, fps, video_path):
+    """Collapse per-frame (frame, gesture, confidence) into one event per continuous gesture"""
+    events = []
+    current = None
+    for frame_index, gesture, confidence in predictions:
+        if current is not None and (gesture != current['gesture'] or frame_index != current['end_frame']):
+            events.append(current)
+            current = None
+        if gesture is None:
+            continue
+        if current is None:
+            current = {'video': video_path, 'gesture': gesture, 'start_frame': frame_index,
+                       'end_frame': frame_index, 'confidences': []}
+        current['end_frame'] = frame_index + 1
+        current['confidences'].append(float(confidence))
+    if current is not None:
+        events.append(current)
+
+    for event in events:
+        confidences = event.pop('confidences')
+        event['start_s'] = round(event['start_frame'] / fps, 3)
+        event['end_s'] = round(event['end_frame'] / fps, 3)
+        event['peak_confidence'] = round(max(confidences), 4)
+        event['mean_confidence'] = round(sum(confidences) / len(confidences), 4)
+    return events
+
+
+def process_segment(video_path, start_frame, end_frame, fps, mirror=False):
+    """Worker entry point: gesture events for frames [start_frame, end_frame) of one video"""
+    first = max(0, start_frame - PREROLL_FRAMES)
+    reader = VideoCaptureReader(video_path)
+    if first:
+        reader.cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+    # Decoding runs on its own thread, overlapping with inference
+    source = FrameSource(reader, live=False)
+    if not source.isOpened():
+        raise RuntimeError(f"Could not open video: {video_path}")
+
+    detector.reset_buffers()
+    predictions = []
+    frame_index = first
+    try:
+        while end_frame is None or frame_index < end_frame:
+            ret, frame = source.read()
+            if not ret:
+                break
+            ctx = FrameContext(frame, mirror=mirror)
+            try:
+                bbox = detector.detect_bbox(ctx)
+                features, _, _, _ = detector.process_landmarks(ctx, bbox, detector.feature_row)
+                detector.add_features(features)
+                gesture, confidence = detector.predict_gesture()
+            except Exception as e:
+                print(f"⚠️ Error processing frame {frame_index} of {video_path}: {e}")
+                gesture, confidence = None, 0.0
+            if frame_index >= start_frame:
+                predictions.append((frame_index, gesture, confidence))
+            frame_index += 1
+    finally:
+        source.release()
+
+    return gesture_events(predictions, fps, video_path), len(predictions)
+
+
+def merge_events(events):
+    """Join events of the same gesture that were split at a segment boundary"""
+    merged = []
+    for event in sorted(events, key=lambda e: (e['video'], e['start_frame'])):
+        previous = merged[-1] if merged else None
+        if (previous is not None and previous['video'] == event['video']
+                and previous['gesture'] == event['gesture'] and previous['end_frame'] == event['start_frame']):
+            previous_frames = previous['end_frame'] - previous['start_frame']
+            event_frames = event['end_frame'] - event['start_frame']
+            previous['mean_confidence'] = round(
+                (previous['mean_confidence'] * previous_frames + event['mean_confidence'] * event_frames)
+                / (previous_frames + event_frames), 4)
+            previous['peak_confidence'] = max(previous['peak_confidence'], event['peak_confidence'])
+            previous['end_frame'], previous['end_s'] = event['end_frame'], event['end_s']
+        else:
+            merged.append(dict(event))
+    return merged
+
+
+def reprocess(video_paths, detector_options, workers=NUM_WORKERS, segment_seconds=None, mirror=False):
+    """Run every video as fast as possible and return the merged gesture timeline"""
+    tasks = plan_segments(video_paths, segment_seconds)
+    total = len(tasks)
+    events = []
+    frames = 0
+
+    if workers <= 1:
+        init_worker(detector_options)
+        for i, task in enumerate(tasks, start=1):
+            try:
+                task_events, task_frames = process_segment(*task, mirror=mirror)
+            except Exception as e:
+                print(f"   [{i}/{total}] ⚠️ {task[0]} from frame {task[1]}: {e}")
+                continue
+            events.extend(task_events)
+            frames += task_frames
+            print(f"   [{i}/{total}] ✅ {task[0]} from frame {task[1]}: {len(task_events)} events")
+        return merge_events(events), frames
+
+    # Split the cores between the workers instead of letting each claim all of them
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"⚙️ Processing {total} segment(s) with {workers} worker processes ({threads} threads each)...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(detector_options, threads)) as executor:
+        futures = {executor.submit(process_segment, *task, mirror=mirror): task for task in tasks}
+        for done, future in enumerate(as_completed(futures), start=1):
+            task = futures[future]
+            try:
+                task_events, task_frames = future.result()
+                events.extend(task_events)
+                frames += task_frames
+                print(f"   [{done}/{total}] ✅ {task[0]} from frame {task[1]}: {len(task_events)} events")
+            except Exception as e:
+                print(f"   [{done}/{total}] ⚠️ {task[0]} from frame {task[1]}: {e}")
+    return merge_events(events), frames
+
+
+def write_events(events, output_path):
+    """JSONL by default; .parquet needs pandas with pyarrow or fastparquet"""
+    if output_path.endswith('.parquet'):
+        import pandas as pd
+        pd.DataFrame(events).to_parquet(output_path, index=False)
+        return
+    with open(output_path, 'w') as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+def find_videos(path):
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(VIDEO_EXTENSIONS))
+    return [path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprocess recorded matches into a gesture event timeline")
+    parser.add_argument('input', help="Video file or directory of videos")
+    parser.add_argument('--output', default="gesture_events.jsonl", help="Event log (.jsonl or .parquet)")
+    parser.add_argument('--workers', type=int, default=NUM_WORKERS)
+    parser.add_argument('--segment-seconds', type=float, default=None,
+                        help="Split videos into segments of this length so one long match uses every worker")
+    parser.add_argument('--model', default="TwoModels/gesture_model.h5")
+    parser.add_argument('--yolo', default="TwoModels/best.pt")
+    parser.add_argument('--backend', default="tf_function")
+    parser.add_argument('--yolo-backend', default="ultralytics")
+    parser.add_argument('--stride', type=int, default=1, help="LSTM inference stride (1 = every frame)")
+    parser.add_argument('--detect-interval', type=int, default=None)
+    parser.add_argument('--process-width', type=int, default=None, help="0 = full resolution")
+    parser.add_argument('--mirror', action='store_true', help="Flip frames like the live webcam view")
+    args = parser.parse_args()
+
+    video_paths = find_videos(args.input)
+    if not video_paths:
+        print(f"❌ No videos found in {args.input}")
+        return
+
+    detector_options = {'model_path': args.model, 'yolo_path': args.yolo, 'backend': args.backend,
+                        'yolo_backend': args.yolo_backend, 'inference_stride': args.stride}
+    if args.detect_interval is not None:
+        detector_options['detect_interval'] = args.detect_interval
+    if args.process_width is not None:
+        detector_options['process_width'] = args.process_width or None
+
+    print(f"🎞️ Reprocessing {len(video_paths)} video(s)...")
+    start = time.perf_counter()
+    events, frames = reprocess(video_paths, detector_options, workers=args.workers,
+                               segment_seconds=args.segment_seconds, mirror=args.mirror)
+    elapsed = time.perf_counter() - start
+
+    write_events(events, args.output)
+    print(f"✅ {frames} frames in {elapsed:.1f}s ({frames / elapsed if elapsed > 0 else 0.0:.1f} FPS), "
+          f"{len(events)} gesture events")
+    print(f"💾 Timeline written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import threading
+
+import numpy as np
+
+# Run YOLO at least every N frames while tracking
+DETECT_INTERVAL = 5
+# Re-detect when the tracked landmarks jump more than this fraction of the frame diagonal in one frame
+MAX_SHIFT = 0.08
+
+
+class RoiTracker:
+    """Detect-then-track for the YOLO box that crops the hand input.
+
+    YOLO runs on the first frame and then every `detect_interval` frames. In
+    between, the last box keeps its size and is moved by the shift of the pose
+    keypoints (shoulders and elbows) that MediaPipe already finds on every
+    frame, so tracking costs no extra model calls. Tracking counts as lost,
+    and YOLO runs again on the next frame, when the pose or the hands in the
+    crop disappear, or when the keypoints jump further than `max_shift`.
+    While YOLO finds nothing, it keeps running on every frame.
+    """
+
+    def __init__(self, detect_interval=DETECT_INTERVAL, max_shift=MAX_SHIFT):
+        self.detect_interval = max(1, detect_interval)
+        self.max_shift = max_shift
+        # The YOLO and landmark stages run on different threads in the pipeline
+        self.lock = threading.Lock()
+        self.detections = 0
+        self.tracked = 0
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.box = None
+            self.anchor = None
+            self.frames_since_detect = 0
+            self.lost = True
+
+    def should_detect(self):
+        with self.lock:
+            return self.lost or self.box is None or self.frames_since_detect >= self.detect_interval
+
+    def on_detect(self, bbox):
+        """Start tracking from a fresh YOLO box (None when YOLO found nothing)"""
+        with self.lock:
+            self.detections += 1
+            self.box = None if bbox is None else np.asarray(bbox, dtype=np.float32)
+            self.anchor = None
+            self.frames_since_detect = 0
+            self.lost = bbox is None
+
+    def predict(self):
+        """The propagated box for a frame that skips YOLO, as int xyxy"""
+        with self.lock:
+            self.tracked += 1
+            self.frames_since_detect += 1
+            return np.round(self.box).astype(int)
+
+    def update(self, pose_points, hands_found, shape):
+        """Move the box with the pose keypoints of the frame that was just processed.
+
+        pose_points are normalized (x, y) pairs with all zeros meaning no pose.
+        """
+        with self.lock:
+            if self.box is None:
+                return
+            if not hands_found or not np.any(pose_points):
+                self.lost = True
+                return
+            h, w = shape[:2]
+            centroid = np.mean(pose_points, axis=0) * (w, h)
+            if self.anchor is not None:
+                shift = centroid - self.anchor
+                if np.hypot(*shift) > self.max_shift * np.hypot(w, h):
+                    self.lost = True
+                    return
+                self.box += np.tile(shift, 2)
+            self.anchor = centroid
+
+    def stats(self):
+        with self.lock:
+            total = self.detections + self.tracked
+            return {
+                'yolo_frames': self.detections,
+                'tracked_frames': self.tracked,
+                'yolo_ratio': self.detections / total if total else 0.0,
+            }
@@ -0,0 +1,41 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class StageTimer:
+    """Collects per-stage latency samples for the detection loop"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        self.samples[name].append(seconds)
+
+    def reset(self):
+        self.samples.clear()
+
+    def summary(self):
+        """Per-stage count, mean and p50/p95/p99 latency in milliseconds"""
+        result = {}
+        for name, samples in self.samples.items():
+            ms = np.asarray(samples) * 1000.0
+            result[name] = {
+                'count': int(len(ms)),
+                'mean_ms': float(ms.mean()),
+                'p50_ms': float(np.percentile(ms, 50)),
+                'p95_ms': float(np.percentile(ms, 95)),
+                'p99_ms': float(np.percentile(ms, 99)),
+                'max_ms': float(ms.max()),
+            }
+        return result
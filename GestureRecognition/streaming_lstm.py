@@ -0,0 +1,147 @@
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+from tensorflow.keras.models import Sequential, load_model
+
+from landmark_features import SEQUENCE_LENGTH
+
+
+class StreamingGestureClassifier:
+    """One-timestep-at-a-time version of the trained sliding-window LSTM.
+
+    The trained weights are copied into a stateful model that takes a single
+    frame per call and carries the LSTM hidden state forward, so each frame
+    costs one recurrent step instead of a full 30-step window.
+
+    The trained model always starts a window from a zero state, so carrying
+    state forever would drift away from its predictions. To stay exactly
+    equivalent, the stateful model runs `phases` independent state rows as a
+    batch, started SEQUENCE_LENGTH / phases frames apart. Every row is reset
+    when it starts a new window and reports once it has seen exactly
+    SEQUENCE_LENGTH frames, giving the same output as the sliding-window model
+    on that window. More phases means more frequent exact predictions; with
+    phases == SEQUENCE_LENGTH there is one on every frame.
+    """
+
+    def __init__(self, gesture_model, phases=10, sequence_length=SEQUENCE_LENGTH):
+        self.phases = phases
+        self.sequence_length = sequence_length
+        feature_size = gesture_model.input_shape[-1]
+
+        layers = [Input(batch_shape=(phases, 1, feature_size))]
+        trained_layers = []
+        for layer in gesture_model.layers:
+            if isinstance(layer, Dropout):
+                continue
+            config = layer.get_config()
+            config.pop('batch_input_shape', None)
+            if isinstance(layer, LSTM):
+                config['stateful'] = True
+                layers.append(LSTM.from_config(config))
+            elif isinstance(layer, Dense):
+                layers.append(Dense.from_config(config))
+            else:
+                raise ValueError(f"Unsupported layer for streaming: {layer.__class__.__name__}")
+            trained_layers.append(layer)
+
+        self.model = Sequential(layers)
+        for streaming_layer, layer in zip(self.model.layers, trained_layers):
+            streaming_layer.set_weights(layer.get_weights())
+        self.lstm_layers = [layer for layer in self.model.layers if isinstance(layer, LSTM)]
+        self.states = [state for layer in self.lstm_layers for state in layer.states]
+        self._step = tf.function(self._masked_step, input_signature=[
+            tf.TensorSpec((phases, 1, feature_size), tf.float32),
+            tf.TensorSpec((phases, 1), tf.float32),
+        ])
+
+        # Frames seen by each phase in its current window; negative = not started yet
+        self.initial_steps = np.array([-(p * sequence_length // phases) for p in range(phases)])
+        self.steps = self.initial_steps.copy()
+        self.step_input = np.zeros((phases, 1, feature_size), dtype=np.float32)
+        self.keep = np.ones((phases, 1), dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        """Clear all state, e.g. when the feature buffer is reset"""
+        for layer in self.lstm_layers:
+            layer.reset_states()
+        self.steps[:] = self.initial_steps
+
+    def _masked_step(self, inputs, keep):
+        # Rows with keep == 0 start a new window from a zero state; zeroing
+        # them in the same graph as the step avoids a host round trip per state
+        for state in self.states:
+            state.assign(state * keep)
+        return self.model(inputs, training=False)
+
+    def step(self, features):
+        """Feed one frame of features.
+
+        Returns the class probabilities of a window that completed on this
+        frame, or None when no phase finished a window.
+        """
+        self.keep[:, 0] = self.steps != 0
+        self.step_input[:, 0, :] = features
+        probabilities = self._step(self.step_input, self.keep).numpy()
+        self.steps += 1
+
+        done = np.flatnonzero(self.steps == self.sequence_length)
+        if len(done) == 0:
+            return None
+        self.steps[done] = 0
+        return probabilities[done[0]]
+
+
+def verify(model_path, phases=10, frames=300, features_path=None):
+    """Compare streaming predictions against model.predict on the same windows"""
+    gesture_model = load_model(model_path)
+    streamer = StreamingGestureClassifier(gesture_model, phases=phases)
+    # Compiled as well, so the timings compare graph against graph
+    predict_window = tf.function(lambda window: gesture_model(window, training=False))
+
+    if features_path:
+        sequence = np.load(features_path).astype(np.float32)
+    else:
+        sequence = np.random.default_rng(0).random((frames, gesture_model.input_shape[-1]), dtype=np.float32)
+
+    # Trace both graphs before timing anything
+    streamer.step(sequence[0])
+    streamer.reset()
+    predict_window(sequence[np.newaxis, :SEQUENCE_LENGTH])
+
+    max_diff, agreements, checked = 0.0, 0, 0
+    stream_time, window_time = 0.0, 0.0
+    for t, row in enumerate(sequence):
+        start = time.perf_counter()
+        probabilities = streamer.step(row)
+        stream_time += time.perf_counter() - start
+        if probabilities is None:
+            continue
+
+        window = sequence[t - SEQUENCE_LENGTH + 1:t + 1][np.newaxis]
+        start = time.perf_counter()
+        expected = predict_window(window).numpy()[0]
+        window_time += time.perf_counter() - start
+
+        max_diff = max(max_diff, float(np.max(np.abs(probabilities - expected))))
+        agreements += int(np.argmax(probabilities) == np.argmax(expected))
+        checked += 1
+
+    print(f"📊 Checked {checked} windows with {phases} phases")
+    print(f"   Max abs difference: {max_diff:.2e}")
+    print(f"   Argmax agreement: {agreements}/{checked}")
+    print(f"   Streaming: {stream_time / len(sequence) * 1000:.2f} ms/frame")
+    if checked:
+        print(f"   Sliding window: {window_time / checked * 1000:.2f} ms/prediction")
+    return max_diff
+
+
+if __name__ == "__main__":
+    # Usage: python streaming_lstm.py [model.h5] [phases] [features.npy]
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "TwoModels/gesture_model.h5"
+    phases = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    features_path = sys.argv[3] if len(sys.argv) > 3 else None
+    verify(model_path, phases=phases, features_path=features_path)
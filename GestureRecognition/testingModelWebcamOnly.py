@@ -1,31 +1,64 @@
 import cv2
 import numpy as np
-import mediapipe as mp
-from ultralytics import YOLO
-from tensorflow.keras.models import load_model
 from collections import deque
+from contextlib import nullcontext
 import time
+from feature_window import FeatureWindow
+from inference_backends import load_backend
+from frame_context import FrameContext, as_context
+from frame_sources import CAMERA_HEIGHT, CAMERA_WIDTH, open_source
+from landmark_features import FEATURE_SIZE, HAND_FEATURES, SEQUENCE_LENGTH, hand_image, write_features
+from roi_tracker import RoiTracker
+from yolo_backends import load_yolo_backend
 
 # Same configuration as training
 GESTURE_CLASSES = ['DynamicChangeOfCourt', 'DynamicServeLeft', 'DynamicServeRight', 'StaticBallOut', 'StaticEndOfMatch', 'StaticPointLeft', 'StaticPointRight']
-SEQUENCE_LENGTH = 30
-HAND_FEATURES = 84
-POSE_FEATURES = 8
-FEATURE_SIZE = HAND_FEATURES + POSE_FEATURES
+
+# Classifier scheduling
+INFERENCE_STRIDE = 3       # run the LSTM every N frames...
+MOTION_THRESHOLD = 0.05    # ...or sooner when the mean landmark change exceeds this
+SMOOTHING_FRAMES = 3       # time span (in frames) the prediction smoothing covers
+
+# YOLO every N frames with the box tracked in between (1 = every frame, like
+# training). Off until tracking has been benchmarked against training accuracy;
+# opt in with e.g. detect_interval=5 (roi_tracker.DETECT_INTERVAL).
+DETECT_INTERVAL = 1
+
+# YOLO and pose can run on a copy downscaled to this width (None = full
+# resolution, like training); the hand crop is still cut from the full-resolution
+# frame. Left off until `benchmark.py --compare-widths 0,960,640` has shown what
+# downscaling costs in accuracy on real footage.
+PROCESS_WIDTH = None
 
 class GestureDetector:
-    def __init__(self, model_path, yolo_path):
-        # Load trained gesture model
-        print("🔄 Loading gesture model...")
-        self.gesture_model = load_model(model_path)
-        print("✅ Gesture model loaded!")
-        
-        # Load YOLO model
-        print("🔄 Loading YOLO model...")
-        self.yolo_model = YOLO(yolo_path)
-        print("✅ YOLO model loaded!")
-        
-        # Initialize MediaPipe
+    def __init__(self, model_path, yolo_path, inference_stride=INFERENCE_STRIDE, motion_threshold=MOTION_THRESHOLD,
+                 streaming_phases=None, backend="tf_function", yolo_backend="ultralytics",
+                 classifier=None, yolo_detector=None, detect_interval=DETECT_INTERVAL,
+                 process_width=PROCESS_WIDTH):
+        # Load trained gesture model ("numpy" runs without TensorFlow), unless an
+        # already loaded one is passed in to be shared between detectors
+        if classifier is None:
+            print(f"🔄 Loading gesture model ({backend} backend)...")
+            classifier = load_backend(backend, model_path)
+            print("✅ Gesture model loaded!")
+        self.classifier = classifier
+        self.gesture_model = getattr(self.classifier, "model", None)
+        
+        # Load YOLO model ("onnx" runs an exported model without torch)
+        if yolo_detector is None:
+            print(f"🔄 Loading YOLO model ({yolo_backend} backend)...")
+            yolo_detector = load_yolo_backend(yolo_backend, yolo_path)
+            print("✅ YOLO model loaded!")
+        self.yolo_detector = yolo_detector
+        self.yolo_model = getattr(self.yolo_detector, "model", None)
+        
+        # Detect-then-track: YOLO every detect_interval frames, the box follows
+        # the pose landmarks in between (detect_interval=1 runs YOLO on every frame)
+        self.roi_tracker = RoiTracker(detect_interval) if detect_interval and detect_interval > 1 else None
+        self.process_width = process_width
+        
+        # Initialize MediaPipe (imported here so importing this module stays cheap)
+        import mediapipe as mp
         self.mp_hands = mp.solutions.hands
         self.mp_pose = mp.solutions.pose
         self.mp_drawing = mp.solutions.drawing_utils
@@ -41,82 +74,239 @@ class GestureDetector:
             min_tracking_confidence=0.5
         )
         
-        # Feature buffer for sequence
-        self.feature_buffer = deque(maxlen=SEQUENCE_LENGTH)
+        # Feature buffer for sequence (preallocated ring buffer, no per-frame allocation)
+        self.feature_buffer = FeatureWindow(SEQUENCE_LENGTH, FEATURE_SIZE)
+        # Scratch feature row for the single-threaded loops (the pipeline allocates per frame)
+        self.feature_row = np.zeros(FEATURE_SIZE, dtype=np.float32)
         
         # Prediction smoothing
         self.prediction_buffer = deque(maxlen=5)
         self.confidence_threshold = 0.7
         
+        # Inference scheduling: predictions are spaced inference_stride frames
+        # apart, so smooth over fewer of them to cover the same time span
+        self.inference_stride = max(1, inference_stride)
+        self.motion_threshold = motion_threshold
+        self.smoothing_window = max(2, -(-SMOOTHING_FRAMES // self.inference_stride))
+        self.frames_since_inference = 0
+        self.last_inference_features = np.zeros(FEATURE_SIZE, dtype=np.float32)
+        self.has_inferred = False
+        self.last_prediction = (None, 0.0)
+        
+        # Optional stateful streaming classifier: one LSTM step per frame, with
+        # an exact window prediction every SEQUENCE_LENGTH / streaming_phases frames
+        self.streaming_classifier = None
+        self.stream_prediction = None
+        if streaming_phases:
+            if self.gesture_model is None:
+                raise ValueError("Streaming mode needs a Keras backend ('keras' or 'tf_function')")
+            from streaming_lstm import StreamingGestureClassifier
+            self.streaming_classifier = StreamingGestureClassifier(self.gesture_model, phases=streaming_phases)
+            spacing = max(1, SEQUENCE_LENGTH // streaming_phases)
+            self.smoothing_window = max(2, -(-SMOOTHING_FRAMES // spacing))
+        
         # Webcam capture
         self.cap = None
         
-    def extract_hand_landmarks(self, image, hand_bbox=None):
-        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # Optional StageTimer (see stage_timing.py) for per-stage latency
+        self.timer = None
+        self.frame_errors = 0
+        self.pipeline = None
         
-        if hand_bbox is not None:
-            x1, y1, x2, y2 = hand_bbox
-            h, w = rgb.shape[:2]
-            x1, y1 = max(0, x1), max(0, y1)
-            x2, y2 = min(w, x2), min(h, y2)
-            if x2 > x1 and y2 > y1:
-                rgb = rgb[y1:y2, x1:x2]
-        
-        result = self.hands.process(rgb)
+        # Optional callable deciding per frame whether overlays are drawn (e.g. "does
+        # anyone watch the video feed?"); headless frames are yielded as None
+        self.annotation_needed = None
+    
+    def warm_up(self, shape=(720, 1280, 3)):
+        """Push one blank frame through YOLO, MediaPipe and the classifier.
         
-        landmarks = []
-        if result.multi_hand_landmarks:
-            for hand_landmarks in result.multi_hand_landmarks:
-                points = [coord for lm in hand_landmarks.landmark for coord in (lm.x, lm.y)]
-                landmarks.append(points)
+        Pays for lazy initialization (graph building, tf.function tracing,
+        first-call allocations) up front, so the first real frame doesn't.
+        """
+        ctx = FrameContext(np.zeros(shape, dtype=np.uint8))
+        self.yolo_detector.detect(ctx.small(self.processing_scale(shape)))
+        self.process_landmarks(ctx)
+        self.classifier.predict(np.zeros((1, SEQUENCE_LENGTH, FEATURE_SIZE), dtype=np.float32))
+        if self.streaming_classifier is not None:
+            self.streaming_classifier.step(np.zeros(FEATURE_SIZE, dtype=np.float32))
+        self.reset_buffers()
+    
+    def stage(self, name):
+        """Time a block under `name` when a StageTimer is attached"""
+        if self.timer is None:
+            return nullcontext()
+        return self.timer.stage(name)
         
-        while len(landmarks) < 2:
-            landmarks.append([0.0] * 42)
-            
-        return np.array(landmarks[:2]).flatten()
+    def processing_scale(self, shape):
+        """Factor from full-resolution to processing-resolution coordinates"""
+        if not self.process_width or shape[1] <= self.process_width:
+            return 1.0
+        return self.process_width / shape[1]
     
-    def extract_pose_landmarks(self, image):
-        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        result = self.pose.process(rgb)
-        
-        if result.pose_landmarks:
-            indices = [11, 12, 13, 14]  # shoulders and elbows
-            return np.array([coord for i in indices 
-                           for coord in (result.pose_landmarks.landmark[i].x, 
-                                       result.pose_landmarks.landmark[i].y)])
-        return np.zeros(POSE_FEATURES)
+    def process_landmarks(self, image, hand_bbox=None, out=None):
+        """Run hands and pose once on a frame.
+        
+        Returns the combined feature vector together with the raw MediaPipe
+        results and the crop box the hand results are relative to, so the
+        same results can be drawn without processing the frame again. The
+        features are written into `out` when given (see landmark_features.py).
+        `image` is a FrameContext or a plain BGR frame.
+        """
+        ctx = as_context(image)
+        scale = self.processing_scale(ctx.shape)
+        
+        # Pose runs first: at full resolution it converts the whole frame, and the
+        # hand crop is then just a view of it. Pose landmarks are normalized, so
+        # they map back to the full frame unchanged.
+        with self.stage("pose"):
+            pose_results = self.pose.process(ctx.small_rgb(scale))
+        # Same crop as training (landmark_features.hand_image)
+        hand_rgb, hand_box = hand_image(ctx, hand_bbox)
+        with self.stage("hands"):
+            hands_results = self.hands.process(hand_rgb)
+        
+        features = write_features(hands_results, pose_results, out)
+        if self.roi_tracker is not None and hand_bbox is not None:
+            self.roi_tracker.update(features[HAND_FEATURES:].reshape(-1, 2),
+                                    hands_results.multi_hand_landmarks is not None, ctx.shape)
+        return features, hands_results, pose_results, hand_box
     
-    def draw_landmarks(self, image, results_hands, results_pose):
-        # Draw hand landmarks
+    def draw_landmarks(self, image, results_hands, results_pose, hand_box=None):
+        # Draw hand landmarks (relative to the YOLO crop when one was used)
         if results_hands.multi_hand_landmarks:
+            hand_image = image
+            if hand_box is not None:
+                x1, y1, x2, y2 = hand_box
+                hand_image = image[y1:y2, x1:x2]
             for hand_landmarks in results_hands.multi_hand_landmarks:
                 self.mp_drawing.draw_landmarks(
-                    image, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+                    hand_image, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
         
         # Draw pose landmarks
         if results_pose.pose_landmarks:
             self.mp_drawing.draw_landmarks(
                 image, results_pose.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
     
+    def detect_bbox(self, frame):
+        """Return the hand crop box for a frame (FrameContext or BGR array) as int xyxy, or None.
+        
+        Runs YOLO, or with ROI tracking enabled, reuses the tracked box on
+        frames between detections.
+        """
+        if self.roi_tracker is not None and not self.roi_tracker.should_detect():
+            return self.roi_tracker.predict()
+        ctx = as_context(frame)
+        scale = self.processing_scale(ctx.shape)
+        with self.stage("yolo"):
+            bbox = self.yolo_detector.detect(ctx.small(scale))
+        if bbox is not None and scale != 1.0:
+            # Back to full-resolution coordinates for the crop and the drawing
+            bbox = np.round(np.asarray(bbox) / scale).astype(int)
+        if self.roi_tracker is not None:
+            self.roi_tracker.on_detect(bbox)
+        return bbox
+    
+    def should_annotate(self):
+        return self.annotation_needed is None or self.annotation_needed()
+    
+    def annotate(self, ctx, bbox, hands_results, pose_results, hand_box, gesture, confidence):
+        """Draw the box, landmarks and prediction in place on the context's frame and return it.
+        
+        Call only after the frame's features were extracted.
+        """
+        image = ctx.frame
+        if bbox is not None:
+            cv2.rectangle(image, (bbox[0], bbox[1]), (bbox[2], bbox[3]), (0, 255, 0), 2)
+        if hands_results is not None:
+            self.draw_landmarks(image, hands_results, pose_results, hand_box)
+        self.draw_prediction(image, gesture, confidence)
+        return image
+    
+    def draw_prediction(self, image, gesture, confidence):
+        # Display buffer status and current prediction on frame
+        buffer_status = f"Buffer: {len(self.feature_buffer)}/{SEQUENCE_LENGTH}"
+        cv2.putText(image, buffer_status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        if gesture and confidence > self.confidence_threshold:
+            prediction_text = f"Gesture: {gesture}"
+            confidence_text = f"Confidence: {confidence:.2f}"
+            cv2.rectangle(image, (10, 60), (500, 120), (0, 255, 0), -1)
+            cv2.putText(image, prediction_text, (15, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+            cv2.putText(image, confidence_text, (15, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+        else:
+            cv2.putText(image, "Detecting...", (10, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+    
+    def should_run_inference(self):
+        """Decide whether the classifier runs on this frame (stride or motion trigger)"""
+        if self.frames_since_inference >= self.inference_stride:
+            return True
+        if self.motion_threshold is not None:
+            motion = np.mean(np.abs(self.feature_buffer.latest() - self.last_inference_features))
+            if motion > self.motion_threshold:
+                return True
+        return False
+    
+    def reset_buffers(self):
+        self.feature_buffer.clear()
+        self.prediction_buffer.clear()
+        self.frames_since_inference = 0
+        self.has_inferred = False
+        self.last_prediction = (None, 0.0)
+        if self.streaming_classifier is not None:
+            self.streaming_classifier.reset()
+            self.stream_prediction = None
+        if self.roi_tracker is not None:
+            self.roi_tracker.reset()
+    
+    def add_features(self, features):
+        """Append one frame of features to the sequence buffer"""
+        self.feature_buffer.append(features)
+        if self.streaming_classifier is not None:
+            # Streaming state must see every frame, not only scheduled ones
+            with self.stage("lstm"):
+                self.stream_prediction = self.streaming_classifier.step(features)
+    
     def predict_gesture(self):
         if len(self.feature_buffer) < SEQUENCE_LENGTH:
             return None, 0.0
         
-        # Prepare sequence for prediction
-        sequence = np.array(list(self.feature_buffer))
-        sequence = sequence.reshape(1, SEQUENCE_LENGTH, FEATURE_SIZE)
+        if self.streaming_classifier is not None:
+            return self.predict_streaming()
+        
+        # Between scheduled inferences, keep reporting the last smoothed result
+        self.frames_since_inference += 1
+        if self.has_inferred and not self.should_run_inference():
+            return self.last_prediction
+        self.frames_since_inference = 0
+        self.has_inferred = True
+        np.copyto(self.last_inference_features, self.feature_buffer.latest())
+        
+        # Contiguous (1, SEQUENCE_LENGTH, FEATURE_SIZE) view of the ring buffer
+        sequence = self.feature_buffer.batch()
         
         # Make prediction
-        prediction = self.gesture_model.predict(sequence, verbose=0)[0]
+        with self.stage("lstm"):
+            prediction = self.classifier.predict(sequence)
         confidence = np.max(prediction)
         gesture_idx = np.argmax(prediction)
         
         # Add to prediction buffer for smoothing
         self.prediction_buffer.append((gesture_idx, confidence))
         
-        # Smooth predictions
-        if len(self.prediction_buffer) >= 3:
-            recent_predictions = list(self.prediction_buffer)[-3:]
+        self.last_prediction = self.smooth_predictions()
+        return self.last_prediction
+    
+    def predict_streaming(self):
+        # Only frames that complete a streaming window produce a new prediction
+        if self.stream_prediction is None:
+            return self.last_prediction
+        prediction, self.stream_prediction = self.stream_prediction, None
+        self.prediction_buffer.append((np.argmax(prediction), np.max(prediction)))
+        self.last_prediction = self.smooth_predictions()
+        return self.last_prediction
+    
+    def smooth_predictions(self):
+        if len(self.prediction_buffer) >= self.smoothing_window:
+            recent_predictions = list(self.prediction_buffer)[-self.smoothing_window:]
             # Get most common prediction with high confidence
             high_conf_predictions = [(idx, conf) for idx, conf in recent_predictions 
                                    if conf > self.confidence_threshold]
@@ -138,14 +328,16 @@ class GestureDetector:
         
         return None, 0.0
     
-    def run_generator(self):
-        """Generator that yields gesture predictions continuously"""
-        self.cap = cv2.VideoCapture(1)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+    def run_generator(self, source=1, realtime=True, fps_cap=None, mirror=True, width=CAMERA_WIDTH, height=CAMERA_HEIGHT):
+        """Generator that yields gesture predictions continuously
+        
+        `source` is anything open_source accepts: a webcam index, a video file,
+        an RTSP/HTTP URL or a directory of frames.
+        """
+        self.cap = open_source(source, width, height, fps_cap=fps_cap, realtime=realtime)
         
         if not self.cap.isOpened():
-            print("❌ Could not open webcam")
+            print(f"❌ Could not open video source: {source}")
             return
         
         print("🎥 Starting gesture detection generator...")
@@ -157,23 +349,18 @@ class GestureDetector:
                     print("❌ Could not read frame")
                     break
                 
-                # Flip frame horizontally for mirror effect
-                frame = cv2.flip(frame, 1)
+                # Flip frame horizontally for mirror effect; derived images are made once, on demand
+                ctx = FrameContext(frame, mirror=mirror)
                 
                 try:
                     # YOLO detection for person/hand detection
-                    yolo_results = self.yolo_model(frame, verbose=False)
-                    bbox = None
-                    if len(yolo_results[0].boxes) > 0:
-                        bbox = yolo_results[0].boxes[0].xyxy[0].cpu().numpy().astype(int)
+                    bbox = self.detect_bbox(ctx)
                     
                     # Extract features
-                    hand_features = self.extract_hand_landmarks(frame, bbox)
-                    pose_features = self.extract_pose_landmarks(frame)
-                    combined_features = np.concatenate([hand_features, pose_features])
+                    combined_features, _, _, _ = self.process_landmarks(ctx, bbox, self.feature_row)
                     
                     # Add to buffer
-                    self.feature_buffer.append(combined_features)
+                    self.add_features(combined_features)
                     
                     # Predict gesture
                     gesture, confidence = self.predict_gesture()
@@ -183,10 +370,13 @@ class GestureDetector:
                     
                 except Exception as e:
                     print(f"⚠️ Error processing frame: {e}")
+                    self.frame_errors += 1
                     yield None, 0.0
                 
-                # Small delay to prevent overwhelming the system
-                time.sleep(0.05)
+                # Small delay to prevent overwhelming the system (live sources only;
+                # files are already paced by the frame source, or run flat out)
+                if self.cap.live:
+                    time.sleep(0.05)
                 
         except KeyboardInterrupt:
             print("🛑 Gesture detection stopped by user")
@@ -194,14 +384,16 @@ class GestureDetector:
             if self.cap:
                 self.cap.release()
     
-    def run_generator_with_frame(self):
-        """Generator that yields gesture, confidence, and annotated frame continuously"""
-        self.cap = cv2.VideoCapture(1)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+    def run_generator_with_frame(self, source=1, realtime=True, fps_cap=None, mirror=True,
+                                 width=CAMERA_WIDTH, height=CAMERA_HEIGHT):
+        """Generator that yields gesture, confidence, and annotated frame continuously
+        
+        The frame is None while annotation_needed reports that nobody is watching.
+        """
+        self.cap = open_source(source, width, height, fps_cap=fps_cap, realtime=realtime)
         
         if not self.cap.isOpened():
-            print("❌ Could not open webcam")
+            print(f"❌ Could not open video source: {source}")
             return
         
         print("🎥 Starting gesture detection generator with frame...")
@@ -213,57 +405,39 @@ class GestureDetector:
                     print("❌ Could not read frame")
                     break
                 
-                # Flip frame horizontally for mirror effect
-                frame = cv2.flip(frame, 1)
-                annotated_frame = frame.copy()
+                # Flip frame horizontally for mirror effect; derived images are made once, on demand
+                ctx = FrameContext(frame, mirror=mirror)
                 try:
                     # YOLO detection for person/hand detection
-                    yolo_results = self.yolo_model(frame, verbose=False)
-                    bbox = None
-                    if len(yolo_results[0].boxes) > 0:
-                        bbox = yolo_results[0].boxes[0].xyxy[0].cpu().numpy().astype(int)
-                        # Draw bounding box
-                        cv2.rectangle(annotated_frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), (0, 255, 0), 2)
+                    bbox = self.detect_bbox(ctx)
                     
-                    # Extract features
-                    hand_features = self.extract_hand_landmarks(frame, bbox)
-                    pose_features = self.extract_pose_landmarks(frame)
-                    combined_features = np.concatenate([hand_features, pose_features])
+                    # Extract features (single MediaPipe pass, results reused for drawing)
+                    combined_features, hands_results, pose_results, hand_box = self.process_landmarks(ctx, bbox, self.feature_row)
                     
                     # Add to buffer
-                    self.feature_buffer.append(combined_features)
-                    
-                    # Draw landmarks for visualization
-                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    hands_results = self.hands.process(rgb_frame)
-                    pose_results = self.pose.process(rgb_frame)
-                    self.draw_landmarks(annotated_frame, hands_results, pose_results)
+                    self.add_features(combined_features)
                     
                     # Predict gesture
                     gesture, confidence = self.predict_gesture()
                     
-                    # Display information on frame
-                    h, w, _ = annotated_frame.shape
-                    buffer_status = f"Buffer: {len(self.feature_buffer)}/{SEQUENCE_LENGTH}"
-                    cv2.putText(annotated_frame, buffer_status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                    if gesture and confidence > self.confidence_threshold:
-                        prediction_text = f"Gesture: {gesture}"
-                        confidence_text = f"Confidence: {confidence:.2f}"
-                        cv2.rectangle(annotated_frame, (10, 60), (500, 120), (0, 255, 0), -1)
-                        cv2.putText(annotated_frame, prediction_text, (15, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
-                        cv2.putText(annotated_frame, confidence_text, (15, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
-                    else:
-                        cv2.putText(annotated_frame, "Detecting...", (10, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+                    # Features are extracted, so draw box, landmarks and prediction in place (no frame
+                    # copy); skipped entirely while headless, the buffers carry on either way
+                    annotated_frame = None
+                    if self.should_annotate():
+                        annotated_frame = self.annotate(ctx, bbox, hands_results, pose_results, hand_box, gesture, confidence)
                     
                     # Yield the result
                     yield gesture, confidence, annotated_frame
                     
                 except Exception as e:
                     print(f"⚠️ Error processing frame: {e}")
-                    yield None, 0.0, annotated_frame
+                    self.frame_errors += 1
+                    yield None, 0.0, ctx.frame if self.should_annotate() else None
                 
-                # Small delay to prevent overwhelming the system
-                time.sleep(0.05)
+                # Small delay to prevent overwhelming the system (live sources only;
+                # files are already paced by the frame source, or run flat out)
+                if self.cap.live:
+                    time.sleep(0.05)
                 
         except KeyboardInterrupt:
             print("🛑 Gesture detection stopped by user")
@@ -271,13 +445,19 @@ class GestureDetector:
             if self.cap:
                 self.cap.release()
     
-    def run(self):
-        cap = cv2.VideoCapture(1)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+    def run_pipelined_with_frame(self, source=1, realtime=True, fps_cap=None, mirror=True,
+                                 width=CAMERA_WIDTH, height=CAMERA_HEIGHT):
+        """Same output as run_generator_with_frame, but each stage runs on its own thread"""
+        from gesture_pipeline import GesturePipeline
+        self.pipeline = GesturePipeline(self, source=source, realtime=realtime, fps_cap=fps_cap, mirror=mirror,
+                                        width=width, height=height)
+        yield from self.pipeline.run_with_frame()
+    
+    def run(self, source=1, realtime=True, fps_cap=None, mirror=True, width=CAMERA_WIDTH, height=CAMERA_HEIGHT):
+        cap = open_source(source, width, height, fps_cap=fps_cap, realtime=realtime)
         
         if not cap.isOpened():
-            print("❌ Could not open webcam")
+            print(f"❌ Could not open video source: {source}")
             return
         
         print("🎥 Starting gesture detection...")
@@ -285,6 +465,7 @@ class GestureDetector:
         print("⌨️  Press 'q' to quit, 'r' to reset buffer")
         
         fps_counter = 0
+        fps = 0.0
         start_time = time.time()
         
         while True:
@@ -294,30 +475,23 @@ class GestureDetector:
                 break
             
             # Flip frame horizontally for mirror effect
-            frame = cv2.flip(frame, 1)
+            ctx = FrameContext(frame, mirror=mirror)
+            frame = ctx.frame
             
             try:
                 # YOLO detection for person/hand detection
-                yolo_results = self.yolo_model(frame, verbose=False)
-                bbox = None
-                if len(yolo_results[0].boxes) > 0:
-                    bbox = yolo_results[0].boxes[0].xyxy[0].cpu().numpy().astype(int)
-                    # Draw bounding box
-                    cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), (0, 255, 0), 2)
+                bbox = self.detect_bbox(ctx)
                 
-                # Extract features
-                hand_features = self.extract_hand_landmarks(frame, bbox)
-                pose_features = self.extract_pose_landmarks(frame)
-                combined_features = np.concatenate([hand_features, pose_features])
+                # Extract features before drawing so overlays never leak into them
+                combined_features, hands_results, pose_results, hand_box = self.process_landmarks(ctx, bbox, self.feature_row)
                 
                 # Add to buffer
-                self.feature_buffer.append(combined_features)
+                self.add_features(combined_features)
                 
-                # Draw landmarks for visualization
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                hands_results = self.hands.process(rgb_frame)
-                pose_results = self.pose.process(rgb_frame)
-                self.draw_landmarks(frame, hands_results, pose_results)
+                # Draw bounding box and landmarks for visualization
+                if bbox is not None:
+                    cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), (0, 255, 0), 2)
+                self.draw_landmarks(frame, hands_results, pose_results, hand_box)
                 
                 # Predict gesture
                 gesture, confidence = self.predict_gesture()
@@ -325,21 +499,8 @@ class GestureDetector:
                 # Display information
                 h, w, _ = frame.shape
                 
-                # Buffer status
-                buffer_status = f"Buffer: {len(self.feature_buffer)}/{SEQUENCE_LENGTH}"
-                cv2.putText(frame, buffer_status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                
-                # Current prediction
-                if gesture and confidence > self.confidence_threshold:
-                    prediction_text = f"Gesture: {gesture}"
-                    confidence_text = f"Confidence: {confidence:.2f}"
-                    
-                    # Green background for high confidence
-                    cv2.rectangle(frame, (10, 60), (500, 120), (0, 255, 0), -1)
-                    cv2.putText(frame, prediction_text, (15, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
-                    cv2.putText(frame, confidence_text, (15, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
-                else:
-                    cv2.putText(frame, "Detecting...", (10, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+                # Buffer status and current prediction
+                self.draw_prediction(frame, gesture, confidence)
                 
                 # FPS counter
                 fps_counter += 1
@@ -348,6 +509,7 @@ class GestureDetector:
                     fps = fps_counter / elapsed
                     fps_counter = 0
                     start_time = time.time()
+                cv2.putText(frame, f"FPS: {fps:.1f}", (w - 150, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
                 
                 # Instructions
                 cv2.putText(frame, "Press 'q' to quit, 'r' to reset", (10, h-20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
@@ -364,8 +526,7 @@ class GestureDetector:
             if key == ord('q'):
                 break
             elif key == ord('r'):
-                self.feature_buffer.clear()
-                self.prediction_buffer.clear()
+                self.reset_buffers()
                 print("🔄 Buffers reset")
         
         cap.release()
@@ -388,9 +549,13 @@ def main():
         print(f"❌ YOLO model not found: {yolo_path}")
         return
     
+    # Video source: webcam index (default 1), video file, RTSP/HTTP URL or frame directory
+    import sys
+    source = sys.argv[1] if len(sys.argv) > 1 else 1
+    
     # Create detector and run
     detector = GestureDetector(model_path, yolo_path)
-    detector.run()
+    detector.run(source)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from batching import MicroBatcher
+
+
+class GatedBatchFn:
+    """batch_fn that holds its first call until released, so later requests queue up behind it"""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = []
+        self.gate = threading.Event()
+
+    def __call__(self, items):
+        self.calls.append(list(items))
+        if len(self.calls) == 1:
+            self.gate.wait(timeout=5)
+        return self.fn(items)
+
+
+def submit_all(batcher, items):
+    """Submit every item from its own thread; returns the threads and a {item: result or exception} dict"""
+    results = {}
+
+    def submit(item):
+        try:
+            results[item] = batcher.submit(item)
+        except Exception as e:
+            results[item] = e
+
+    threads = [threading.Thread(target=submit, args=(item,)) for item in items]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def queue_behind_first(batcher, batch_fn, items):
+    """Run items[0] alone, queue the rest while it runs, then release; returns the results"""
+    threads, results = submit_all(batcher, items[:1])
+    wait_for(lambda: len(batch_fn.calls) == 1)
+    more_threads, more_results = submit_all(batcher, items[1:])
+    wait_for(lambda: batcher.requests.qsize() == len(items) - 1)
+    batch_fn.gate.set()
+    for thread in threads + more_threads:
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+    return {**results, **more_results}
+
+
+def test_lone_request_runs_without_waiting():
+    batcher = MicroBatcher(lambda items: [-item for item in items], max_batch=8, max_wait=5.0)
+
+    start = time.monotonic()
+    assert batcher.submit(3) == -3
+    assert time.monotonic() - start < 1.0
+    assert batcher.batch_sizes == [1]
+
+
+def test_queued_requests_run_as_one_batch_and_each_caller_gets_its_own_result():
+    batch_fn = GatedBatchFn(lambda items: [item * 10 for item in items])
+    batcher = MicroBatcher(batch_fn, max_batch=8, max_wait=5.0)
+    results = queue_behind_first(batcher, batch_fn, [1, 2, 3, 4])
+
+    assert results == {1: 10, 2: 20, 3: 30, 4: 40}
+    assert sorted(batch_fn.calls[1]) == [2, 3, 4]
+    assert batcher.batch_sizes == [1, 3]
+
+
+def test_max_batch_caps_a_batch():
+    batch_fn = GatedBatchFn(lambda items: list(items))
+    batcher = MicroBatcher(batch_fn, max_batch=2, max_wait=5.0)
+    results = queue_behind_first(batcher, batch_fn, [1, 2, 3, 4])
+
+    assert results == {1: 1, 2: 2, 3: 3, 4: 4}
+    assert batcher.batch_sizes == [1, 2, 1]
+
+
+def test_batch_fn_error_reaches_every_caller():
+    def fail(items):
+        raise ValueError("model failed")
+
+    batch_fn = GatedBatchFn(fail)
+    batcher = MicroBatcher(batch_fn, max_batch=8, max_wait=5.0)
+    results = queue_behind_first(batcher, batch_fn, [1, 2, 3])
+
+    assert all(isinstance(result, ValueError) for result in results.values())
+
+
+def test_short_result_list_fails_unmatched_callers():
+    batch_fn = GatedBatchFn(lambda items: [item * 10 for item in items][:1])
+    batcher = MicroBatcher(batch_fn, max_batch=8, max_wait=5.0)
+    results = queue_behind_first(batcher, batch_fn, [1, 2, 3])
+
+    errors = [result for result in results.values() if isinstance(result, Exception)]
+    assert results[1] == 10
+    assert len(errors) == 1
+    assert isinstance(errors[0], RuntimeError)
+    assert "1 results for 2 requests" in str(errors[0])
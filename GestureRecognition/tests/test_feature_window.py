@@ -0,0 +1,50 @@
+import numpy as np
+
+from feature_window import FeatureWindow
+
+
+def rows(start, stop, feature_size=3):
+    return [np.full(feature_size, i, dtype=np.float32) for i in range(start, stop)]
+
+
+def test_partial_window():
+    window = FeatureWindow(4, 3)
+    for row in rows(1, 3):
+        window.append(row)
+
+    assert len(window) == 2
+    assert not window.is_full()
+    np.testing.assert_array_equal(window.latest(), np.full(3, 2))
+
+
+def test_window_is_last_rows_oldest_first_after_wrapping():
+    window = FeatureWindow(4, 3)
+    # Wrap the ring several times, ending at every possible write index
+    for count in range(4, 13):
+        window.clear()
+        for row in rows(0, count):
+            window.append(row)
+
+        assert window.is_full()
+        np.testing.assert_array_equal(window.window()[:, 0], np.arange(count - 4, count))
+        np.testing.assert_array_equal(window.latest(), np.full(3, count - 1))
+
+
+def test_window_is_a_view_of_storage():
+    window = FeatureWindow(4, 3)
+    for row in rows(0, 6):
+        window.append(row)
+
+    assert np.shares_memory(window.window(), window.storage)
+    assert window.batch().shape == (1, 4, 3)
+    assert np.shares_memory(window.batch(), window.storage)
+
+
+def test_clear():
+    window = FeatureWindow(4, 3)
+    for row in rows(1, 6):
+        window.append(row)
+    window.clear()
+
+    assert len(window) == 0
+    assert not window.storage.any()
@@ -0,0 +1,72 @@
+import time
+
+import cv2
+import numpy as np
+
+from frame_sources import open_source
+
+
+def write_frames(path, count):
+    # Zero-padded names, written out of order, to check the sorted read order
+    for i in reversed(range(count)):
+        cv2.imwrite(str(path / f"{i:03d}.png"), np.full((8, 8, 3), i, dtype=np.uint8))
+
+
+def read_all(source):
+    frames = []
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            return frames
+        frames.append(frame)
+
+
+def test_image_directory_delivers_every_frame_in_order(tmp_path):
+    write_frames(tmp_path, 12)
+    (tmp_path / "notes.txt").write_text("not a frame")
+    source = open_source(str(tmp_path), realtime=False)
+
+    assert source.isOpened()
+    assert not source.live
+    frames = read_all(source)
+    source.release()
+
+    assert [int(frame[0, 0, 0]) for frame in frames] == list(range(12))
+
+
+def test_end_of_source_keeps_returning_false(tmp_path):
+    write_frames(tmp_path, 2)
+    source = open_source(str(tmp_path), realtime=False)
+    read_all(source)
+
+    assert source.read() == (False, None)
+    assert source.read() == (False, None)
+    source.release()
+
+
+def test_fps_cap_paces_a_finite_source(tmp_path):
+    write_frames(tmp_path, 6)
+    source = open_source(str(tmp_path), fps_cap=50, realtime=False)
+
+    start = time.monotonic()
+    frames = read_all(source)
+    elapsed = time.monotonic() - start
+    source.release()
+
+    assert len(frames) == 6
+    # The first frame is immediate, the other five at least 20 ms apart
+    assert elapsed >= 5 * 0.02 * 0.9
+
+
+def test_missing_path_is_not_opened(tmp_path):
+    source = open_source(str(tmp_path / "missing.mp4"), realtime=False)
+
+    assert not source.isOpened()
+    assert source.read() == (False, None)
+    source.release()
+
+
+def test_empty_directory_is_not_opened(tmp_path):
+    source = open_source(str(tmp_path), realtime=False)
+
+    assert not source.isOpened()
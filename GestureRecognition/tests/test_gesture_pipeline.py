@@ -0,0 +1,57 @@
+import time
+
+import cv2
+import numpy as np
+
+from gesture_pipeline import GesturePipeline
+
+
+class StubDetector:
+    """Just enough of GestureDetector for the pipeline, with slow landmark and classifier stages"""
+
+    def __init__(self):
+        self.seen = []
+
+    def detect_bbox(self, ctx):
+        return None
+
+    def process_landmarks(self, ctx, bbox):
+        time.sleep(0.005)
+        return np.array([ctx.frame[0, 0, 0]]), None, None, None
+
+    def add_features(self, features):
+        self.seen.append(int(features[0]))
+
+    def predict_gesture(self):
+        time.sleep(0.005)
+        return None, 0.0
+
+    def should_annotate(self):
+        return False
+
+
+def write_frames(path, count):
+    for i in range(count):
+        cv2.imwrite(str(path / f"{i:03d}.png"), np.full((8, 8, 3), i, dtype=np.uint8))
+
+
+def test_finite_source_delivers_every_frame_in_order(tmp_path):
+    write_frames(tmp_path, 20)
+    detector = StubDetector()
+    pipeline = GesturePipeline(detector, source=str(tmp_path), realtime=False, mirror=False)
+
+    outputs = list(pipeline.run_with_frame())
+
+    assert len(outputs) == 20
+    assert detector.seen == list(range(20))
+    assert pipeline.dropped_frames == 0
+
+
+def test_live_source_keeps_only_the_latest_frame():
+    pipeline = GesturePipeline(StubDetector())
+    pipeline.live = True
+    for item in range(3):
+        pipeline._forward(pipeline.capture_queue, item)
+
+    assert pipeline.capture_queue.get_nowait() == 2
+    assert pipeline.dropped_frames == 2
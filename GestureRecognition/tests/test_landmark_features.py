@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from frame_context import FrameContext
+from landmark_features import (FEATURE_SIZE, HAND_FEATURES, clip_box, hand_image, write_features, write_hand_features,
+                               write_pose_features)
+
+
+def stub_hands(count, seed=0):
+    rng = np.random.default_rng(seed)
+    hands = [SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=0.5) for x, y in rng.random((21, 2))])
+             for _ in range(count)]
+    return SimpleNamespace(multi_hand_landmarks=hands or None)
+
+
+def stub_pose(present, seed=1):
+    if not present:
+        return SimpleNamespace(pose_landmarks=None)
+    rng = np.random.default_rng(seed)
+    landmarks = [SimpleNamespace(x=x, y=y, z=0.5) for x, y in rng.random((33, 2))]
+    return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=landmarks))
+
+
+# The original list-comprehension extraction, kept as the reference layout
+
+def reference_hand_features(result):
+    landmarks = []
+    if result.multi_hand_landmarks:
+        for hand_landmarks in result.multi_hand_landmarks:
+            landmarks.append([coord for lm in hand_landmarks.landmark for coord in (lm.x, lm.y)])
+    while len(landmarks) < 2:
+        landmarks.append([0.0] * 42)
+    return np.array(landmarks[:2]).flatten()
+
+
+def reference_pose_features(result):
+    if result.pose_landmarks:
+        return np.array([coord for i in [11, 12, 13, 14]
+                         for coord in (result.pose_landmarks.landmark[i].x, result.pose_landmarks.landmark[i].y)])
+    return np.zeros(8)
+
+
+@pytest.mark.parametrize("hand_count", [0, 1, 2, 3])
+@pytest.mark.parametrize("pose_present", [True, False])
+def test_layout_matches_reference(hand_count, pose_present):
+    hands, pose = stub_hands(hand_count), stub_pose(pose_present)
+    expected = np.concatenate([reference_hand_features(hands), reference_pose_features(pose)]).astype(np.float32)
+
+    features = write_features(hands, pose)
+
+    assert features.shape == (FEATURE_SIZE,)
+    assert features.dtype == np.float32
+    np.testing.assert_array_equal(features, expected)
+
+
+def test_writes_into_a_reused_row():
+    row = np.full(FEATURE_SIZE, 7.0, dtype=np.float32)
+    write_features(stub_hands(2), stub_pose(True), row)
+
+    # A later frame with less detected must not leave stale values behind
+    result = write_features(stub_hands(1), stub_pose(False), row)
+
+    assert result is row
+    np.testing.assert_array_equal(row, np.concatenate([reference_hand_features(stub_hands(1)),
+                                                       np.zeros(8)]).astype(np.float32))
+
+
+def test_partial_writers_fill_their_slices():
+    row = np.zeros(FEATURE_SIZE, dtype=np.float32)
+    write_hand_features(stub_hands(2), row[:HAND_FEATURES])
+    write_pose_features(stub_pose(True), row[HAND_FEATURES:])
+
+    np.testing.assert_array_equal(row, write_features(stub_hands(2), stub_pose(True)))
+
+
+def test_clip_box():
+    shape = (100, 200, 3)
+    assert clip_box(None, shape) is None
+    assert clip_box((10, 20, 50, 60), shape) == (10, 20, 50, 60)
+    assert clip_box((-5, -5, 250, 150), shape) == (0, 0, 200, 100)
+    # Nothing left inside the frame
+    assert clip_box((210, 10, 260, 50), shape) is None
+    assert clip_box((50, 50, 50, 80), shape) is None
+
+
+@pytest.mark.parametrize("box", [None, (10, 20, 50, 60), (-5, -5, 250, 150), (210, 10, 260, 50)])
+def test_hand_image_matches_the_original_training_crop(box):
+    frame = np.random.default_rng(0).integers(0, 256, (100, 200, 3), dtype=np.uint8)
+
+    # What training did before the crop moved here
+    expected = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    if box is not None:
+        x1, y1, x2, y2 = box
+        x1, y1, x2, y2 = max(0, x1), max(0, y1), min(200, x2), min(100, y2)
+        if x2 > x1 and y2 > y1:
+            expected = expected[y1:y2, x1:x2]
+
+    rgb, hand_box = hand_image(FrameContext(frame), box)
+
+    np.testing.assert_array_equal(rgb, expected)
+    assert hand_box == clip_box(box, frame.shape)
@@ -0,0 +1,76 @@
+from reprocess import gesture_events, merge_events
+
+
+def test_gesture_events_split_on_change_gap_and_none():
+    predictions = [
+        (0, 'StaticBallOut', 0.6),
+        (1, 'StaticBallOut', 0.8),
+        (2, None, 0.0),
+        (3, 'StaticBallOut', 0.9),
+        (4, 'StaticPointLeft', 0.7),
+        # Frame 5 is missing, so the same gesture at 6 is a new event
+        (6, 'StaticPointLeft', 0.5),
+    ]
+    events = gesture_events(predictions, fps=10.0, video_path='match.mp4')
+
+    assert [(e['gesture'], e['start_frame'], e['end_frame']) for e in events] == [
+        ('StaticBallOut', 0, 2),
+        ('StaticBallOut', 3, 4),
+        ('StaticPointLeft', 4, 5),
+        ('StaticPointLeft', 6, 7),
+    ]
+    first = events[0]
+    assert first['video'] == 'match.mp4'
+    assert (first['start_s'], first['end_s']) == (0.0, 0.2)
+    assert first['peak_confidence'] == 0.8
+    assert first['mean_confidence'] == 0.7
+
+
+def test_gesture_events_empty():
+    assert gesture_events([], fps=30.0, video_path='match.mp4') == []
+    assert gesture_events([(0, None, 0.0)], fps=30.0, video_path='match.mp4') == []
+
+
+def event(video, gesture, start, end, mean, peak, fps=10.0):
+    return {'video': video, 'gesture': gesture, 'start_frame': start, 'end_frame': end,
+            'start_s': start / fps, 'end_s': end / fps, 'mean_confidence': mean, 'peak_confidence': peak}
+
+
+def test_merge_events_joins_segment_boundaries():
+    # Out of order, as segments finish in any order
+    events = [
+        event('a.mp4', 'StaticBallOut', 10, 40, 0.9, 0.95),
+        event('a.mp4', 'StaticBallOut', 0, 10, 0.5, 0.6),
+    ]
+    merged = merge_events(events)
+
+    assert len(merged) == 1
+    assert (merged[0]['start_frame'], merged[0]['end_frame']) == (0, 40)
+    assert merged[0]['end_s'] == 4.0
+    assert merged[0]['peak_confidence'] == 0.95
+    # Weighted by frames: (0.5 * 10 + 0.9 * 30) / 40
+    assert merged[0]['mean_confidence'] == 0.8
+
+
+def test_merge_events_keeps_distinct_events():
+    events = [
+        event('a.mp4', 'StaticBallOut', 0, 10, 0.5, 0.6),
+        event('a.mp4', 'StaticPointLeft', 10, 20, 0.5, 0.6),
+        event('a.mp4', 'StaticPointLeft', 21, 30, 0.5, 0.6),
+        event('b.mp4', 'StaticPointLeft', 30, 40, 0.5, 0.6),
+    ]
+    merged = merge_events(events)
+
+    assert [(e['video'], e['gesture'], e['start_frame']) for e in merged] == [
+        ('a.mp4', 'StaticBallOut', 0),
+        ('a.mp4', 'StaticPointLeft', 10),
+        ('a.mp4', 'StaticPointLeft', 21),
+        ('b.mp4', 'StaticPointLeft', 30),
+    ]
+
+
+def test_merge_events_does_not_modify_input():
+    events = [event('a.mp4', 'StaticBallOut', 0, 10, 0.5, 0.6), event('a.mp4', 'StaticBallOut', 10, 20, 0.7, 0.8)]
+    merge_events(events)
+
+    assert events[0]['end_frame'] == 10
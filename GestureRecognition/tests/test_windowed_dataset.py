@@ -0,0 +1,46 @@
+import numpy as np
+
+from windowed_dataset import WindowedDataset
+
+
+def make_clips(lengths, feature_size=4):
+    """Clips whose frame values encode (clip, frame) so windows can be traced back"""
+    return [np.array([[100 * c + f] * feature_size for f in range(length)], dtype=np.float32)
+            for c, length in enumerate(lengths)]
+
+
+def test_windows_never_cross_clip_boundaries():
+    clips = make_clips([5, 2, 4])
+    dataset = WindowedDataset.from_clips(clips, [0, 1, 2], sequence_length=3, feature_size=4)
+
+    # Clip 0 has 3 windows, clip 1 is too short, clip 2 (starting at frame 7) has 2
+    assert list(dataset.starts) == [0, 1, 2, 7, 8]
+    assert list(dataset.labels) == [0, 0, 0, 2, 2]
+    assert dataset.shape == (5, 3, 4)
+
+    windows = dataset.windows(np.arange(len(dataset)))
+    expected = [clips[0][0:3], clips[0][1:4], clips[0][2:5], clips[2][0:3], clips[2][1:4]]
+    np.testing.assert_array_equal(windows, np.stack(expected))
+
+
+def test_subset_shares_frames():
+    dataset = WindowedDataset.from_clips(make_clips([4, 4]), [0, 1], sequence_length=2, feature_size=4)
+    subset = dataset.subset(np.array([4, 0]))
+
+    assert subset.frames is dataset.frames
+    assert list(subset.labels) == [1, 0]
+    np.testing.assert_array_equal(subset.windows(np.arange(2)), dataset.windows(np.array([4, 0])))
+
+
+def test_clips_shorter_than_a_window():
+    dataset = WindowedDataset.from_clips(make_clips([2, 1]), [0, 1], sequence_length=3, feature_size=4)
+
+    assert len(dataset) == 0
+    assert dataset.shape == (0, 3, 4)
+
+
+def test_no_clips():
+    dataset = WindowedDataset.from_clips([], [], sequence_length=3, feature_size=4)
+
+    assert len(dataset) == 0
+    assert dataset.frames.shape == (0, 4)
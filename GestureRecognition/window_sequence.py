@@ -0,0 +1,30 @@
+import numpy as np
+from tensorflow.keras.utils import Sequence
+
+
+class WindowSequence(Sequence):
+    """Keras batches gathered on the fly from a WindowedDataset"""
+
+    def __init__(self, dataset, labels=None, batch_size=32, shuffle=False):
+        super().__init__()
+        self.dataset = dataset
+        self.labels = labels
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.order = np.arange(len(dataset))
+        if shuffle:
+            np.random.shuffle(self.order)
+
+    def __len__(self):
+        return int(np.ceil(len(self.order) / self.batch_size))
+
+    def __getitem__(self, batch):
+        indices = self.order[batch * self.batch_size:(batch + 1) * self.batch_size]
+        windows = self.dataset.windows(indices)
+        if self.labels is None:
+            return windows
+        return windows, self.labels[indices]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.order)
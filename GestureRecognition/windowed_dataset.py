@@ -0,0 +1,63 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class WindowedDataset:
+    """Overlapping fixed-length windows over per-clip frame features, built lazily.
+
+    Every clip's (frames, features) array is stored once, concatenated into a
+    single float32 array. Windows are a strided view over it, limited to start
+    positions that stay inside one clip, and are only copied out a batch at a
+    time. Memory therefore grows with the number of frames rather than
+    frames x sequence length.
+    """
+
+    def __init__(self, frames, starts, labels, sequence_length):
+        self.frames = frames
+        self.starts = starts
+        self.labels = labels
+        self.sequence_length = sequence_length
+        if len(frames) >= sequence_length:
+            # (positions, features, length) view -> (positions, length, features)
+            self.view = sliding_window_view(frames, sequence_length, axis=0).transpose(0, 2, 1)
+        else:
+            self.view = None
+
+    @classmethod
+    def from_clips(cls, clip_features, clip_labels, sequence_length, feature_size):
+        starts, labels, offset = [], [], 0
+        for features, label in zip(clip_features, clip_labels):
+            count = len(features) - sequence_length + 1
+            if count > 0:
+                starts.append(np.arange(offset, offset + count))
+                labels.append(np.full(count, label))
+            offset += len(features)
+
+        if clip_features:
+            frames = np.concatenate([np.asarray(f, dtype=np.float32) for f in clip_features])
+        else:
+            frames = np.zeros((0, feature_size), dtype=np.float32)
+        starts = np.concatenate(starts) if starts else np.zeros(0, dtype=int)
+        labels = np.concatenate(labels) if labels else np.zeros(0, dtype=int)
+        return cls(frames, starts, labels, sequence_length)
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def shape(self):
+        return (len(self.starts), self.sequence_length, self.frames.shape[1])
+
+    def windows(self, indices):
+        """Copy out the windows at the given dataset indices as a (len, length, features) array"""
+        return self.view[self.starts[indices]]
+
+    def subset(self, indices):
+        """A dataset over some of the windows, sharing the same frame storage"""
+        subset = WindowedDataset.__new__(WindowedDataset)
+        subset.frames = self.frames
+        subset.view = self.view
+        subset.sequence_length = self.sequence_length
+        subset.starts = self.starts[indices]
+        subset.labels = self.labels[indices]
+        return subset
@@ -0,0 +1,111 @@
+import threading
+
+import cv2
+import numpy as np
+
+# Person/hand box detectors. Every backend exposes detect(frame), taking a BGR
+# frame and returning the highest-confidence box as int [x1, y1, x2, y2] in
+# frame coordinates, or None. That is all GestureDetector uses from YOLO.
+
+
+class UltralyticsDetector:
+    """Ultralytics YOLO; loads .pt as well as exported .onnx/.tflite files"""
+
+    def __init__(self, model_path):
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+
+    @staticmethod
+    def _first_box(result):
+        if len(result.boxes) > 0:
+            return result.boxes[0].xyxy[0].cpu().numpy().astype(int)
+        return None
+
+    def detect(self, frame):
+        return self._first_box(self.model(frame, verbose=False)[0])
+
+    def detect_batch(self, frames):
+        """One forward pass over frames from several streams"""
+        return [self._first_box(result) for result in self.model(list(frames), verbose=False)]
+
+
+class OnnxYoloDetector:
+    """Runs an exported YOLO .onnx with ONNX Runtime only, without torch or ultralytics.
+
+    Only the single best box is needed, so instead of full NMS the candidate
+    with the highest class score is taken, which is the box Ultralytics
+    would rank first.
+    """
+
+    def __init__(self, model_path, conf_threshold=0.25, num_threads=None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_size = model_input.shape[2] if isinstance(model_input.shape[2], int) else 640
+        self.input_dtype = np.float16 if 'float16' in model_input.type else np.float32
+        self.conf_threshold = conf_threshold
+
+    def letterbox(self, frame):
+        """Resize keeping aspect ratio and pad to a square input, like Ultralytics does"""
+        h, w = frame.shape[:2]
+        scale = min(self.input_size / h, self.input_size / w)
+        new_w, new_h = int(round(w * scale)), int(round(h * scale))
+        pad_x = (self.input_size - new_w) / 2
+        pad_y = (self.input_size - new_h) / 2
+
+        resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        top, left = int(round(pad_y - 0.1)), int(round(pad_x - 0.1))
+        bottom, right = self.input_size - new_h - top, self.input_size - new_w - left
+        padded = cv2.copyMakeBorder(resized, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+        # HWC BGR uint8 -> NCHW RGB in [0, 1]; astype copies into a contiguous array
+        blob = cv2.cvtColor(padded, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)[np.newaxis]
+        return blob.astype(self.input_dtype) / 255.0, scale, left, top
+
+    def detect(self, frame):
+        blob, scale, pad_x, pad_y = self.letterbox(frame)
+        output = self.session.run(None, {self.input_name: blob})[0][0]
+
+        # (4 + classes, candidates): cx, cy, w, h followed by class scores
+        scores = output[4:].max(axis=0)
+        best = int(np.argmax(scores))
+        if scores[best] < self.conf_threshold:
+            return None
+
+        cx, cy, bw, bh = output[:4, best]
+        box = np.array([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], dtype=np.float32)
+        box[[0, 2]] = (box[[0, 2]] - pad_x) / scale
+        box[[1, 3]] = (box[[1, 3]] - pad_y) / scale
+        h, w = frame.shape[:2]
+        box[[0, 2]] = box[[0, 2]].clip(0, w)
+        box[[1, 3]] = box[[1, 3]].clip(0, h)
+        return box.astype(int)
+
+
+class SharedYoloDetector:
+    """Lets several detectors share one loaded YOLO model; Ultralytics predictors aren't thread-safe"""
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.model = getattr(detector, 'model', None)
+        self.lock = threading.Lock()
+
+    def detect(self, frame):
+        with self.lock:
+            return self.detector.detect(frame)
+
+
+YOLO_BACKENDS = {
+    'ultralytics': UltralyticsDetector,
+    'onnx': OnnxYoloDetector,
+}
+
+
+def load_yolo_backend(name, model_path):
+    if name not in YOLO_BACKENDS:
+        raise ValueError(f"Unknown YOLO backend '{name}', choose from {sorted(YOLO_BACKENDS)}")
+    return YOLO_BACKENDS[name](model_path)